@@ -1,99 +1,130 @@
-from langchain.tools import Tool
-from location_services import LocationServices
+from location_services import LocationServices, normalize_location
+from caching import TTLCache
 from typing import List, Dict
-from models import HospitalSearchResult
-import json
+from models import HospitalSearchResult, PoliceStationSearchResult
+import os
 
+# Malls, hotels and restaurants, in the order they are listed to the user
+SAFE_PLACE_TYPES = ['shopping_mall', 'lodging', 'restaurant']
+
+# Tool name -> AgentTools method that renders the full answer for the user
+USER_FACING_METHODS = {
+    'find_hospitals': 'find_hospitals_structured',
+    'get_hospitals_json': 'get_hospitals_json',
+    'find_police_stations': 'find_police_stations',
+    'find_emergency_services': 'find_emergency_services',
+    'find_safe_places': 'find_safe_places',
+}
 
-from models import HospitalSearchResult
 
 class AgentTools:
-    def __init__(self):
-        self.location_service = LocationServices()
-    
+    def __init__(self, location_service=None):
+        self.location_service = location_service or LocationServices()
+        # One lookup feeds the agent, the user-facing answer and the JSON API for a short while
+        self.result_cache = TTLCache(
+            max_size=int(os.getenv('TOOL_RESULT_CACHE_SIZE', '256')),
+            ttl_seconds=float(os.getenv('TOOL_RESULT_CACHE_TTL_SECONDS', '120'))
+        )
+
+    def hospital_result(self, location: str, radius: int = 5000) -> HospitalSearchResult:
+        """Structured hospital lookup, shared through the result cache; empty results are not cached"""
+        key = ('hospital', normalize_location(location), radius)
+        result = self.result_cache.get(key)
+        if result is None:
+            result = self.location_service.find_nearby_hospitals_structured(location, radius)
+            if result.total_found:
+                self.result_cache.set(key, result)
+        return result
+
+    async def ahospital_result(self, location: str, radius: int = 5000) -> HospitalSearchResult:
+        """Async version of hospital_result"""
+        key = ('hospital', normalize_location(location), radius)
+        result = self.result_cache.get(key)
+        if result is None:
+            result = await self.location_service.afind_nearby_hospitals_structured(location, radius)
+            if result.total_found:
+                self.result_cache.set(key, result)
+        return result
+
+    def police_result(self, location: str, radius: int = 5000) -> PoliceStationSearchResult:
+        """Structured police station lookup, shared through the result cache"""
+        key = ('police', normalize_location(location), radius)
+        result = self.result_cache.get(key)
+        if result is None:
+            result = self.location_service.find_nearby_police_structured(location, radius)
+            if result.total_found:
+                self.result_cache.set(key, result)
+        return result
+
+    async def apolice_result(self, location: str, radius: int = 5000) -> PoliceStationSearchResult:
+        """Async version of police_result"""
+        key = ('police', normalize_location(location), radius)
+        result = self.result_cache.get(key)
+        if result is None:
+            result = await self.location_service.afind_nearby_police_structured(location, radius)
+            if result.total_found:
+                self.result_cache.set(key, result)
+        return result
+
     def find_hospitals_structured(self, location: str) -> str:
         """Find nearby hospitals with structured output"""
-        hospital_result = self.location_service.find_nearby_hospitals_structured(location)
-        
-        if hospital_result['total_found'] == 0:
-            return f"I'm having trouble finding hospitals near {location} right now 💜 Please double-check the location name and try again, or I can help you with emergency numbers: 102 (Ambulance)."
-        
-        result = f"🏥 **Hospitals near {hospital_result['query_location']}:**\n\n"
-        result += f"📊 **Found {hospital_result['total_found']} hospitals within {hospital_result['search_radius_km']} km**\n\n"
-        
-        for i, hospital in enumerate(hospital_result['hospitals'], 1):
-            result += f"**{i}. {hospital['name']}**\n"
-            result += f"   📍 **Address:** {hospital['address']}\n"
-            result += f"   📏 **Distance:** {hospital['distance_km']} km away\n"
-            
-            if hospital.get('contact_number'):
-                result += f"   📞 **Contact:** {hospital['contact_number']}\n"
-            else:
-                result += f"   📞 **Contact:** Not available\n"
-                
-            if hospital.get('rating'):
-                result += f"   ⭐ **Rating:** {hospital['rating']}/5\n"
-            
-            if hospital.get('location_coordinates'):
-                result += f"   🗺️ **Coordinates:** {hospital['location_coordinates']['lat']}, {hospital['location_coordinates']['lng']}\n"
-            
-            result += "\n"
-        
-        result += "\n🚨 **Emergency Number:** 102 (Ambulance)\n"
-        result += "💡 **Tip:** Call ahead to check availability and services."
-        
-        return result
-    
+        return self.hospital_result(location).to_markdown()
+
+    async def afind_hospitals_structured(self, location: str) -> str:
+        """Async version of find_hospitals_structured"""
+        return (await self.ahospital_result(location)).to_markdown()
+
     def get_hospitals_json(self, location: str) -> str:
         """Get hospitals data as JSON for API responses"""
-        hospital_result = self.location_service.find_nearby_hospitals_structured(location)
-        return json.dumps(hospital_result, indent=2)
-    
+        return self.hospital_result(location).to_json()
+
+    async def aget_hospitals_json(self, location: str) -> str:
+        """Async version of get_hospitals_json"""
+        return (await self.ahospital_result(location)).to_json()
+
     def find_police_stations(self, location: str) -> str:
         """Find nearby police stations"""
-        stations = self.location_service.find_nearby_places(location, 'police')
-        
-        if stations and 'error' in stations[0]:
-            return f"I'm having trouble finding police stations right now 💜 Please try again in a moment, or call emergency: 100 (Police)"
-        
-        if not stations:
-            return f"I'm having trouble finding police stations near {location} right now 💜 Please double-check the location name and try again, or call emergency: 100 (Police)"
-        
-        result = f"🚔 **Police Stations near {location}:**\n\n"
-        for i, station in enumerate(stations, 1):
-            result += f"**{i}. {station['name']}**\n"
-            result += f"   📍 **Address:** {station['address']}\n"
-            if station.get('rating'):
-                result += f"   ⭐ **Rating:** {station['rating']}/5\n"
-            result += f"   📏 **Distance:** {station['distance_km']} km\n"
-            result += "\n"
-        
-        result += "\n🚨 **Emergency Number:** 100 (Police)\n"
-        result += "💡 **Tip:** Save these numbers in your phone for quick access."
-        
-        return result
-    
+        return self.police_result(location).to_markdown()
+
+    async def afind_police_stations(self, location: str) -> str:
+        """Async version of find_police_stations"""
+        return (await self.apolice_result(location)).to_markdown()
+
+    def run_for_user(self, tool_name: str, location: str) -> str:
+        """Full user-facing answer of a tool, for callers that skip the ReAct agent"""
+        return getattr(self, USER_FACING_METHODS[tool_name])(location)
+
+    async def arun_for_user(self, tool_name: str, location: str) -> str:
+        """Async version of run_for_user"""
+        return await getattr(self, 'a' + USER_FACING_METHODS[tool_name])(location)
+
     def find_emergency_services(self, location: str) -> str:
         """Find all emergency services"""
-        hospitals = self.location_service.find_nearby_places(location, 'hospital')[:3]
-        police = self.location_service.find_nearby_places(location, 'police')[:3]
-        
+        places = self.location_service.find_nearby_places_multi(location, ['hospital', 'police'], limit=3)
+        return self._format_emergency_services(location, places['hospital'], places['police'])
+
+    async def afind_emergency_services(self, location: str) -> str:
+        """Async version of find_emergency_services"""
+        places = await self.location_service.afind_nearby_places_multi(location, ['hospital', 'police'], limit=3)
+        return self._format_emergency_services(location, places['hospital'], places['police'])
+
+    def _format_emergency_services(self, location: str, hospitals: List[Dict], police: List[Dict]) -> str:
         result = f"🚨 **Emergency Services near {location}:**\n\n"
-        
+
         if hospitals and 'error' not in hospitals[0]:
             result += "🏥 **Nearest Hospitals:**\n"
             for hospital in hospitals:
                 result += f"• **{hospital['name']}** - {hospital['distance_km']} km\n"
                 result += f"  📍 {hospital['address']}\n"
             result += "\n"
-        
+
         if police and 'error' not in police[0]:
             result += "🚔 **Nearest Police Stations:**\n"
             for station in police:
                 result += f"• **{station['name']}** - {station['distance_km']} km\n"
                 result += f"  📍 {station['address']}\n"
             result += "\n"
-        
+
         result += "📞 **Emergency Numbers:**\n"
         result += "• 🚨 **Police:** 100\n"
         result += "• 🏥 **Ambulance:** 102\n"
@@ -101,70 +132,89 @@ class AgentTools:
         result += "• 🆘 **Women Helpline:** 1091\n"
         result += "• 📱 **Emergency:** 112 (All services)\n\n"
         result += "💡 **Safety Tip:** Share your location with trusted contacts when in emergency."
-        
+
         return result
-    
+
     def find_safe_places(self, location: str) -> str:
         """Find safe places like malls, hotels, etc."""
-        # Search for multiple types of safe places
-        malls = self.location_service.find_nearby_places(location, 'shopping_mall')[:3]
-        hotels = self.location_service.find_nearby_places(location, 'lodging')[:3]
-        restaurants = self.location_service.find_nearby_places(location, 'restaurant')[:3]
-        
+        # Search for multiple types of safe places with a single geocode
+        places = self.location_service.find_nearby_places_multi(location, SAFE_PLACE_TYPES, limit=3)
+        return self._format_safe_places(location, *(places[place_type] for place_type in SAFE_PLACE_TYPES))
+
+    async def afind_safe_places(self, location: str) -> str:
+        """Async version of find_safe_places"""
+        places = await self.location_service.afind_nearby_places_multi(location, SAFE_PLACE_TYPES, limit=3)
+        return self._format_safe_places(location, *(places[place_type] for place_type in SAFE_PLACE_TYPES))
+
+    def _format_safe_places(self, location: str, malls: List[Dict], hotels: List[Dict], restaurants: List[Dict]) -> str:
         result = f"🛡️ **Safe Places near {location}:**\n\n"
-        
+
         if malls and 'error' not in malls[0]:
             result += "🏬 **Shopping Malls (Well-lit, Security):**\n"
             for mall in malls:
                 result += f"• **{mall['name']}** - {mall['distance_km']} km\n"
             result += "\n"
-        
+
         if hotels and 'error' not in hotels[0]:
             result += "🏨 **Hotels (24/7 Reception):**\n"
             for hotel in hotels:
                 result += f"• **{hotel['name']}** - {hotel['distance_km']} km\n"
             result += "\n"
-        
+
         if restaurants and 'error' not in restaurants[0]:
             result += "🍽️ **Restaurants (Public Places):**\n"
             for restaurant in restaurants:
                 result += f"• **{restaurant['name']}** - {restaurant['distance_km']} km\n"
             result += "\n"
-        
+
         result += "💡 **Safety Tips:**\n"
         result += "• Choose well-lit, crowded places\n"
         result += "• Look for places with security cameras\n"
         result += "• Avoid isolated areas, especially at night\n"
         result += "• Trust your instincts - if something feels wrong, leave"
-        
+
         return result
-    
-    def get_tools(self) -> List[Tool]:
+
+    async def _ahospitals_for_llm(self, location: str) -> str:
+        return (await self.ahospital_result(location)).to_llm_text()
+
+    async def _apolice_for_llm(self, location: str) -> str:
+        return (await self.apolice_result(location)).to_llm_text()
+
+    def get_tools(self) -> List:
         """Get all available tools for the agent"""
+        # Imported here so the warm-up path can answer location queries before LangChain loads
+        from langchain.tools import Tool
         return [
             Tool(
                 name="find_hospitals",
                 description="Find nearby hospitals. Use this when someone asks about hospitals, medical facilities, or emergency medical care near a location.",
-                func=self.find_hospitals_structured  # Updated to use structured version
+                # The agent only needs a compact summary; the user-facing answer is rendered separately
+                func=lambda location: self.hospital_result(location).to_llm_text(),
+                coroutine=self._ahospitals_for_llm
             ),
             Tool(
                 name="get_hospitals_json",
                 description="Get hospital data in JSON format for structured responses.",
-                func=self.get_hospitals_json
+                func=self.get_hospitals_json,
+                coroutine=self.aget_hospitals_json
             ),
             Tool(
                 name="find_police_stations",
                 description="Find nearby police stations and law enforcement facilities. Input should be a location name, address, or city name.",
-                func=self.find_police_stations
+                func=lambda location: self.police_result(location).to_llm_text(),
+                coroutine=self._apolice_for_llm
             ),
             Tool(
                 name="find_emergency_services",
                 description="Find all emergency services including hospitals, police stations, and emergency contact numbers. Input should be a location name, address, or city name.",
-                func=self.find_emergency_services
+                func=self.find_emergency_services,
+                coroutine=self.afind_emergency_services
             ),
             Tool(
                 name="find_safe_places",
                 description="Find safe places like malls, hotels, restaurants where someone can seek help or feel secure. Input should be a location name, address, or city name.",
-                func=self.find_safe_places
+                func=self.find_safe_places,
+                coroutine=self.afind_safe_places
             )
         ]
@@ -1,6 +1,7 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse, JSONResponse
+from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
 import uvicorn
 import asyncio
@@ -8,42 +9,48 @@ from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 import time
+import json
+import hmac
 
 # Import custom modules
-from enhanced_agent import EnhancedSheGuardiaAgent
-from location_services import LocationServices
-from rag_knowledge import setup_knowledge_base
+from location_services import get_shared_geocode_cache, get_shared_tile_cache
+from http_client import get_shared_http_client
 from models import HospitalSearchResult
+from services import registry, get_agent, get_location_service, get_knowledge_base, get_agent_tools
+from intent_classifier import IntentClassifier
+from query_parsing import pick_location_tool, extract_location_from_context
+from deadline import request_deadline
+from static_responses import EMERGENCY_RESPONSE, GREETING_RESPONSE, NOT_READY_RESPONSE
 
 # Load environment variables
 load_dotenv()
 
-# Global services
-agent = None
-location_service = None
-knowledge_base = None
+# Latency budget for one chat request, shared by classification, retrieval, tools and the LLM
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "60"))
+
+# Upper bound on concurrent agent runs for one /chat/batch request
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "8"))
+
+# Most prompts or queries one batch request may carry; larger batches are rejected with 422
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "32"))
+
+# Keyword rules need no model, so they can answer while the agent warms up
+rules_classifier = IntentClassifier()
 
 # -------------------------------------------------------------------------
 # 🌐 FastAPI Lifespan (Startup / Shutdown)
 # -------------------------------------------------------------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global agent, location_service, knowledge_base
-    try:
-        agent = EnhancedSheGuardiaAgent()
-        print("✅ Enhanced SheGuardia Agent initialized")
-
-        location_service = LocationServices()
-        print("✅ Location Services initialized")
-
-        knowledge_base = setup_knowledge_base()
-        print("✅ Knowledge Base initialized")
-
-    except Exception as e:
-        print(f"❌ Error during startup: {e}")
+    # Cheap services are ready before the first request; models and indexes load in the background
+    registry.initialize_fast()
+    warm_up_task = asyncio.create_task(registry.warm_up())
 
     yield
+    if not warm_up_task.done():
+        print("⚠️ Shutting down before warm-up finished")
     print("🔄 Shutting down services...")
+    await get_shared_http_client().aclose()
 
 # -------------------------------------------------------------------------
 # 🚀 FastAPI App
@@ -97,6 +104,19 @@ class KnowledgeResponse(BaseModel):
     knowledge: str
     sources: List[str]
 
+class BatchKnowledgeRequest(BaseModel):
+    queries: List[str] = Field(max_length=MAX_BATCH_SIZE)
+    k: Optional[int] = 3
+
+class BatchKnowledgeResponse(BaseModel):
+    results: List[KnowledgeResponse]
+
+class BatchChatRequest(BaseModel):
+    requests: List[ChatRequest] = Field(max_length=MAX_BATCH_SIZE)
+
+class BatchChatResponse(BaseModel):
+    responses: List[ChatResponse]
+
 # -------------------------------------------------------------------------
 # 🌍 Endpoints
 # -------------------------------------------------------------------------
@@ -105,34 +125,59 @@ async def root():
     return {
         "message": "SheGuardia API - Women's Safety Assistant",
         "version": "1.0.0",
-        "endpoints": ["/chat", "/location/search", "/knowledge/search", "/health"]
+        "endpoints": ["/chat", "/chat/stream", "/chat/batch", "/location/search", "/knowledge/search", "/knowledge/search/batch", "/knowledge/ingest", "/health", "/ready"]
     }
 
 @app.get("/health")
-async def health_check():
+async def health_check(agent=Depends(get_agent), location_service=Depends(get_location_service),
+                       knowledge_base=Depends(get_knowledge_base)):
     return {
         "status": "healthy",
         "agent_available": agent is not None,
         "location_service_available": location_service is not None,
         "knowledge_base_available": knowledge_base is not None,
+        "geocode_cache": get_shared_geocode_cache().stats(),
+        "places_tile_cache": get_shared_tile_cache().stats(),
+        "knowledge_cache": knowledge_base.cache_stats() if knowledge_base else None,
+        "semantic_cache": agent.semantic_cache.stats() if agent else None,
         "api_keys": {
             "deepseek": bool(os.getenv("DEEPSEEK_API_KEY")),
             "google_places": bool(os.getenv("GOOGLE_PLACES_API_KEY"))
         }
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Per-component readiness and load time; 503 until warm-up has finished"""
+    readiness = registry.readiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
 # -------------------------------------------------------------------------
 # 💬 Chat Endpoint (Graceful Errors + Timeout)
 # -------------------------------------------------------------------------
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, agent=Depends(get_agent), agent_tools=Depends(get_agent_tools)):
     """Chat with the Enhanced SheGuardia Agent"""
+    return await _chat(request, agent, agent_tools)
+
+@app.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch_endpoint(request: BatchChatRequest, agent=Depends(get_agent),
+                              agent_tools=Depends(get_agent_tools)):
+    """Answer independent prompts concurrently, at most CHAT_BATCH_CONCURRENCY at a time"""
+    semaphore = asyncio.Semaphore(CHAT_BATCH_CONCURRENCY)
+
+    async def limited(chat_request: ChatRequest):
+        async with semaphore:
+            return await _chat(chat_request, agent, agent_tools)
+
+    responses = await asyncio.gather(*(limited(chat_request) for chat_request in request.requests))
+    return BatchChatResponse(responses=responses)
+
+async def _chat(request: ChatRequest, agent, agent_tools=None) -> ChatResponse:
     if not agent:
-        return ChatResponse(
-            response="Hey lovely 💜, I’m still getting ready to chat. Please try again in a few moments!",
-            intent="system",
-            sources=[]
-        )
+        with request_deadline(REQUEST_DEADLINE_SECONDS):
+            response, intent = await _warming_up_reply(request, agent_tools)
+        return ChatResponse(response=response, intent=intent, sources=[])
 
     try:
         conversation_history = [
@@ -140,17 +185,19 @@ async def chat_endpoint(request: ChatRequest):
             for msg in request.conversation_history
         ]
 
-        # Run with timeout protection
-        response = await asyncio.wait_for(
-            asyncio.to_thread(agent.process_query, request.message, conversation_history),
-            timeout=170
-        )
+        # Each step gets only what is left of the budget; the wait_for is a backstop that cancels the pipeline
+        with request_deadline(REQUEST_DEADLINE_SECONDS) as deadline:
+            result = await asyncio.wait_for(
+                agent.aprocess_query_with_intent(request.message, conversation_history),
+                timeout=deadline.seconds
+            )
 
-        intent = agent.classify_intent(request.message, conversation_history)
-        return ChatResponse(response=response, intent=intent, sources=[])
+        return ChatResponse(response=result.response, intent=result.intent, sources=result.sources)
 
     except asyncio.TimeoutError:
-        # Graceful user-facing timeout message
+        # Emergencies still get the static block; anything else gets a graceful timeout message
+        if rules_classifier.classify_by_rules(request.message) == 'emergency':
+            return ChatResponse(response=EMERGENCY_RESPONSE, intent="emergency", sources=[])
         return ChatResponse(
             response="I'm so sorry 💜 it’s taking a bit longer than usual. Can you please try again?",
             intent="timeout",
@@ -166,11 +213,73 @@ async def chat_endpoint(request: ChatRequest):
             sources=[]
         )
 
+# -------------------------------------------------------------------------
+# 📡 Streaming Chat Endpoint (Server-Sent Events)
+# -------------------------------------------------------------------------
+def _format_sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _sse_events(events):
+    """Serialize agent (event, data) pairs, ending the stream gracefully on errors"""
+    try:
+        with request_deadline(REQUEST_DEADLINE_SECONDS):
+            async for event, data in events:
+                yield _format_sse(event, data)
+    except Exception as e:
+        print(f"⚠️ Chat stream error: {e}")
+        yield _format_sse("token", {"text": "Oops! Something went wrong while processing your request 💜 Please try again."})
+        yield _format_sse("done", {})
+
+async def _warming_up_reply(request: ChatRequest, agent_tools=None):
+    """Answers that need no model while the agent is loading: static emergency and greeting
+    replies, and location lookups the keyword router can place without the LLM"""
+    message = request.message
+    intent = rules_classifier.classify_by_rules(message)
+    if intent == 'emergency':
+        return EMERGENCY_RESPONSE, intent
+    if intent == 'greeting':
+        return GREETING_RESPONSE, intent
+
+    tool_name = pick_location_tool(message)
+    if agent_tools and tool_name:
+        user_lines = "\n".join(f"User: {msg.content}" for msg in request.conversation_history if msg.role == "user")
+        location = extract_location_from_context(message, user_lines)
+        if location:
+            try:
+                return await agent_tools.arun_for_user(tool_name, location), "location"
+            except Exception as e:
+                print(f"⚠️ Warm-up location lookup failed: {e}")
+    return NOT_READY_RESPONSE, "system"
+
+async def _not_ready_events(request: ChatRequest, agent_tools=None):
+    response, intent = await _warming_up_reply(request, agent_tools)
+    yield "metadata", {"intent": intent, "sources": []}
+    yield "token", {"text": response}
+    yield "done", {}
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, agent=Depends(get_agent), agent_tools=Depends(get_agent_tools)):
+    """Stream the agent response as server-sent events: metadata first, then tokens, then done"""
+    if not agent:
+        events = _not_ready_events(request, agent_tools)
+    else:
+        conversation_history = [
+            {"role": msg.role, "content": msg.content}
+            for msg in request.conversation_history
+        ]
+        events = agent.astream_query(request.message, conversation_history)
+
+    return StreamingResponse(
+        _sse_events(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # -------------------------------------------------------------------------
 # 📍 Location Search (Graceful Errors)
 # -------------------------------------------------------------------------
 @app.post("/location/search", response_model=LocationResponse)
-async def location_search(request: LocationRequest):
+async def location_search(request: LocationRequest, location_service=Depends(get_location_service)):
     if not location_service:
         return LocationResponse(
             results=[],
@@ -202,7 +311,7 @@ async def location_search(request: LocationRequest):
 # 🧠 Knowledge Base Search (Graceful Errors)
 # -------------------------------------------------------------------------
 @app.post("/knowledge/search", response_model=KnowledgeResponse)
-async def knowledge_search(request: KnowledgeRequest):
+async def knowledge_search(request: KnowledgeRequest, knowledge_base=Depends(get_knowledge_base)):
     if not knowledge_base:
         return KnowledgeResponse(
             knowledge="Sorry 💜 I can’t access the knowledge base right now. Please try again later.",
@@ -210,7 +319,8 @@ async def knowledge_search(request: KnowledgeRequest):
         )
 
     try:
-        docs = knowledge_base.similarity_search(request.query, k=request.k)
+        # A cache miss runs the embedding model, keep it off the event loop
+        docs = await asyncio.to_thread(knowledge_base.similarity_search, request.query, request.k)
         knowledge = "\n\n".join([doc.page_content for doc in docs])
         sources = [doc.metadata.get("source", "Unknown") for doc in docs]
 
@@ -222,11 +332,70 @@ async def knowledge_search(request: KnowledgeRequest):
             sources=[]
         )
 
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints are off unless KNOWLEDGE_ADMIN_TOKEN is set, and then need it in X-Admin-Token"""
+    admin_token = os.getenv("KNOWLEDGE_ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(
+            status_code=403,
+            detail="Ingestion over HTTP is disabled; run `python rag_knowledge.py update` or set KNOWLEDGE_ADMIN_TOKEN"
+        )
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/knowledge/ingest", dependencies=[Depends(require_admin_token)])
+async def knowledge_ingest(knowledge_base=Depends(get_knowledge_base)):
+    """Embed new or changed PDFs in data/ into the live store and purge deleted ones"""
+    if not knowledge_base:
+        raise HTTPException(status_code=503, detail="Knowledge base not initialized")
+    # Already loaded with the knowledge base; a top-level import would pull in the embedding stack at startup
+    from rag_knowledge import IngestionInProgress
+
+    try:
+        return await asyncio.to_thread(knowledge_base.update_vectorstore)
+    except IngestionInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        print(f"⚠️ Knowledge ingestion error: {e}")
+        raise HTTPException(status_code=500, detail="Knowledge base ingestion failed")
+
+@app.post("/knowledge/search/batch", response_model=BatchKnowledgeResponse)
+async def knowledge_search_batch(request: BatchKnowledgeRequest, knowledge_base=Depends(get_knowledge_base)):
+    """Search many queries with a single batched embedding pass and one multi-vector store query"""
+    if not knowledge_base:
+        return BatchKnowledgeResponse(results=[
+            KnowledgeResponse(
+                knowledge="Sorry 💜 I can’t access the knowledge base right now. Please try again later.",
+                sources=[]
+            )
+            for _ in request.queries
+        ])
+
+    try:
+        # Embedding is CPU-bound, keep it off the event loop
+        batches = await asyncio.to_thread(knowledge_base.similarity_search_batch, request.queries, request.k)
+        return BatchKnowledgeResponse(results=[
+            KnowledgeResponse(
+                knowledge="\n\n".join([doc.page_content for doc in docs]),
+                sources=[doc.metadata.get("source", "Unknown") for doc in docs]
+            )
+            for docs in batches
+        ])
+    except Exception as e:
+        print(f"⚠️ Batch knowledge search error: {e}")
+        return BatchKnowledgeResponse(results=[
+            KnowledgeResponse(
+                knowledge="Hmm, I couldn’t retrieve that info right now 💜 Please try again later.",
+                sources=[]
+            )
+            for _ in request.queries
+        ])
+
 # -------------------------------------------------------------------------
 # 🧾 Agent Info
 # -------------------------------------------------------------------------
 @app.get("/agent/info")
-async def agent_info():
+async def agent_info(agent=Depends(get_agent)):
     if not agent:
         return {"status": "Agent not initialized"}
     return agent.get_agent_info()
@@ -235,13 +404,23 @@ async def agent_info():
 # 🏥 Structured Hospital Data
 # -------------------------------------------------------------------------
 @app.get("/api/hospitals/{location}", response_model=HospitalSearchResult)
-async def get_hospitals_structured(location: str, radius: int = 5000):
+async def get_hospitals_structured(location: str, radius: int = 5000,
+                                   location_service=Depends(get_location_service),
+                                   agent_tools=Depends(get_agent_tools)):
+    empty_result = HospitalSearchResult(
+        query_location=location, hospitals=[], total_found=0, search_radius_km=radius / 1000
+    )
+    if not location_service:
+        return empty_result
+
     try:
-        location_service = LocationServices()
-        return location_service.find_nearby_hospitals_structured(location, radius)
+        # Shares cached lookups with the agent's hospital tool once the tools are loaded
+        if agent_tools:
+            return await agent_tools.ahospital_result(location, radius)
+        return await location_service.afind_nearby_hospitals_structured(location, radius)
     except Exception as e:
         print(f"⚠️ Hospital search error: {e}")
-        return HospitalSearchResult(hospitals=[], location=location)
+        return empty_result
 
 # -------------------------------------------------------------------------
 # 🚀 FastAPI Server Runner
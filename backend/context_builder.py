@@ -0,0 +1,137 @@
+import os
+import re
+import hashlib
+import threading
+from caching import TTLCache
+from query_parsing import extract_location, SUMMARY_PREFIX, SUMMARY_SEPARATOR
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    """cl100k_base is close enough to DeepSeek's tokenizer for budgeting; None if it cannot be loaded"""
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            if tiktoken is not None:
+                try:
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    print(f"Error loading tiktoken encoding, estimating tokens from length: {e}")
+        return _encoding
+
+def count_tokens(text):
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to at most max_tokens, marking the cut with an ellipsis"""
+    encoding = _get_encoding()
+    if encoding is None:
+        max_chars = max_tokens * 4
+        return text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]).rstrip() + "…"
+
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s")
+
+class ConversationContextBuilder:
+    """Conversation context for prompts within a token budget: recent turns verbatim, older ones summarized"""
+
+    def __init__(self, token_budget=None, message_token_limit=None, recent_messages=None, summary_token_budget=None):
+        self.token_budget = token_budget if token_budget is not None else int(os.getenv('CONTEXT_TOKEN_BUDGET', '600'))
+        self.message_token_limit = message_token_limit if message_token_limit is not None else int(os.getenv('CONTEXT_MESSAGE_TOKEN_LIMIT', '150'))
+        self.recent_messages = recent_messages if recent_messages is not None else int(os.getenv('CONTEXT_RECENT_MESSAGES', '6'))
+        self.summary_token_budget = summary_token_budget if summary_token_budget is not None else int(os.getenv('CONTEXT_SUMMARY_TOKEN_BUDGET', '150'))
+        # Prefix hash of the history -> summary extracts up to that message
+        self.summary_cache = TTLCache(max_size=2048, ttl_seconds=3600)
+
+    def build(self, query, conversation_history=None):
+        history = conversation_history or []
+        query_line = f"User: {truncate_to_tokens(query, self.message_token_limit * 2)}"
+        # Turns before summary_end are summarized; the rest are kept verbatim while they fit
+        summary_end = max(0, len(history) - self.recent_messages)
+        verbatim = {index: self._render(history[index]) for index in range(summary_end, len(history))}
+        line_tokens = {index: count_tokens(line) for index, line in verbatim.items()}
+        latest_user = max((index for index in verbatim if history[index]["role"] == "user"), default=None)
+        summary_line = self._summary_line(history[:summary_end])
+
+        def over_budget():
+            used = count_tokens(query_line) + sum(line_tokens[index] for index in verbatim)
+            return used + (count_tokens(summary_line) if summary_line else 0) > self.token_budget
+
+        # Assistant replies go first: the user's own words carry the thread and any location
+        for index in [index for index in sorted(verbatim) if history[index]["role"] != "user"]:
+            if not over_budget():
+                break
+            del verbatim[index]
+
+        # Then older user turns, folded into the summary; the latest one is always kept
+        for index in sorted(verbatim):
+            if not over_budget() or index == latest_user:
+                break
+            del verbatim[index]
+            summary_end = index + 1
+            summary_line = self._summary_line(history[:summary_end])
+
+        lines = [verbatim[index] for index in sorted(verbatim)] + [query_line]
+        return "\n".join(([summary_line] if summary_line else []) + lines)
+
+    def _render(self, msg):
+        role = "User" if msg["role"] == "user" else "SheGuardia"
+        return f"{role}: {truncate_to_tokens(msg['content'], self.message_token_limit)}"
+
+    def _summary_line(self, messages):
+        summary = self.summarize(messages)
+        return f"{SUMMARY_PREFIX}{summary}" if summary else None
+
+    def summarize(self, messages):
+        """Extractive rolling summary of older user turns, extended from the longest cached prefix"""
+        if not messages:
+            return ""
+
+        prefix_hashes = []
+        digest = ""
+        for msg in messages:
+            digest = hashlib.sha1(f"{digest}\x00{msg['role']}\x00{msg['content']}".encode("utf-8")).hexdigest()
+            prefix_hashes.append(digest)
+
+        cached = self.summary_cache.get(prefix_hashes[-1])
+        if cached is not None:
+            return SUMMARY_SEPARATOR.join(cached)
+
+        # Resume from the longest prefix summarized on an earlier request
+        extracts, start = [], 0
+        for index in range(len(messages) - 2, -1, -1):
+            previous = self.summary_cache.get(prefix_hashes[index])
+            if previous is not None:
+                extracts, start = list(previous), index + 1
+                break
+
+        for index in range(start, len(messages)):
+            msg = messages[index]
+            if msg["role"] == "user":
+                first_sentence = SENTENCE_END_PATTERN.split(msg["content"].strip(), maxsplit=1)[0]
+                extract = truncate_to_tokens(first_sentence, 40)
+                # Keep a place named later in the message, the router still needs it
+                location = extract_location(msg["content"])
+                if location and extract_location(extract) != location:
+                    extract = f"{extract} (in {location})"
+                extracts.append(extract)
+                # Oldest extracts give way first
+                while len(extracts) > 1 and count_tokens(SUMMARY_SEPARATOR.join(extracts)) > self.summary_token_budget:
+                    extracts.pop(0)
+            self.summary_cache.set(prefix_hashes[index], list(extracts))
+
+        return SUMMARY_SEPARATOR.join(extracts)
@@ -0,0 +1,50 @@
+import time
+import contextvars
+from contextlib import contextmanager
+
+# Set once per request; asyncio tasks and to_thread inherit it, plain thread pools need submit_with_deadline
+_current_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+class DeadlineExceeded(TimeoutError):
+    """The request's latency budget ran out before this step could start"""
+
+class Deadline:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+@contextmanager
+def request_deadline(seconds):
+    """Bound everything run inside the block, including tools and HTTP calls, to one budget"""
+    deadline = Deadline(seconds)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+def current_deadline():
+    return _current_deadline.get()
+
+def time_left(cap=None):
+    """Seconds a step may take: the remaining budget, capped by the step's own timeout"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return cap
+    remaining = deadline.remaining()
+    return remaining if cap is None else min(cap, remaining)
+
+def check_deadline(step="request"):
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceeded(f"No time left for {step}")
+
+def submit_with_deadline(executor, fn, *args):
+    """executor.submit that carries the caller's deadline into the worker thread"""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
@@ -1,29 +1,56 @@
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain_core.prompts import PromptTemplate
 from langchain_deepseek import ChatDeepSeek
-from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 from agent_tools import AgentTools
 from rag_knowledge import setup_knowledge_base
+from models import QueryResult
+from intent_classifier import IntentClassifier, VALID_INTENTS
+from static_responses import EMERGENCY_RESPONSE, GREETING_RESPONSE
+from semantic_cache import SemanticResponseCache
+from context_builder import ConversationContextBuilder
+from deadline import time_left, check_deadline
+from query_parsing import extract_location_from_context, pick_location_tool, TOOL_KEYWORDS
 from dotenv import load_dotenv
 from typing import List, Dict, Optional
 import os
 import re
+import json
+import asyncio
 
 load_dotenv()
 
+class ResponsePlan:
+    """How a classified query will be answered: a ready response or a prompt for the LLM"""
+    def __init__(self, intent: str, sources: Optional[List[str]] = None, response: Optional[str] = None,
+                 prompt: Optional[str] = None, fallback: Optional[str] = None, location: Optional[str] = None):
+        self.intent = intent
+        self.sources = sources or []
+        self.response = response
+        self.prompt = prompt
+        self.fallback = fallback
+        # Place to look up nearby emergency services for, when the user named one
+        self.location = location
+        # Set when the generated answer may be stored in the semantic response cache
+        self.cache_query = None
+
 class EnhancedSheGuardiaAgent:
-    def __init__(self):
-        # Initialize LLM
+    def __init__(self, knowledge_base=None, agent_tools=None):
+        """Shared services can be injected; anything not passed in is built here"""
+        # Initialize LLM; every call is further limited to what is left of the request's deadline
+        self.llm_timeout = float(os.getenv('LLM_TIMEOUT_SECONDS', '30'))
         self.llm = ChatDeepSeek(
             model="deepseek-chat",
             temperature=0.1,
             max_tokens=1000,
-            timeout=180,
-            max_retries=5,
+            timeout=self.llm_timeout,
+            max_retries=int(os.getenv('LLM_MAX_RETRIES', '1')),
             api_key=os.getenv('DEEPSEEK_API_KEY')
         )
         
+        # Emergencies get the static block at once; tool results and personalized text must arrive within these
+        self.emergency_tool_budget = float(os.getenv('EMERGENCY_TOOL_BUDGET_S', '5'))
+        self.emergency_llm_budget = float(os.getenv('EMERGENCY_LLM_BUDGET_S', '4'))
+        
         # Custom RAG prompt template
         self.custom_prompt_template = """
 You are SheGuardia - a caring companion, protector, and trusted friend for women. You're like a wise, supportive sister who's always there to listen, guide, and empower.
@@ -73,21 +100,38 @@ Respond as her trusted friend who genuinely cares. Make it engaging and referenc
         
         # Load RAG knowledge base
         try:
-            kb = setup_knowledge_base()
-            self.vector_store = kb.vectorstore
+            kb = knowledge_base or setup_knowledge_base()
+            self.knowledge_base = kb
+            self.vector_store = kb.retriever
             print("✅ RAG knowledge base loaded successfully")
         except Exception as e:
             print(f"❌ Error loading RAG knowledge base: {e}")
+            self.knowledge_base = None
             self.vector_store = None
         
+        # Token-budgeted conversation context, built once per request and shared by every prompt
+        self.context_builder = ConversationContextBuilder()
+        
+        # Local fast-path classifier reuses the knowledge base embeddings and its query embedding cache
+        self.intent_classifier = IntentClassifier(
+            embedding_model_provider=self._get_embedding_model,
+            embed_query=lambda text: self.knowledge_base.embed_query(text)
+        )
+        
+        # Opt-in reuse of answers to near-identical FAQ-style questions
+        self.semantic_cache = SemanticResponseCache(embed_query=lambda text: self.knowledge_base.embed_query(text))
+        
         # Initialize agent tools
         try:
-            self.agent_tools = AgentTools()
+            self.agent_tools = agent_tools or AgentTools()
             self.tools = self.agent_tools.get_tools()
+            self.tools_by_name = {tool.name: tool for tool in self.tools}
             print(f"✅ Loaded {len(self.tools)} agent tools")
         except Exception as e:
             print(f"❌ Error loading agent tools: {e}")
+            self.agent_tools = None
             self.tools = []
+            self.tools_by_name = {}
         
         # Create agent
         if self.tools:
@@ -142,40 +186,80 @@ Thought: {agent_scratchpad}
             verbose=False,
             handle_parsing_errors="I couldn't follow the tool format perfectly. Here's my best direct answer.",
             max_iterations=20,  
-            max_execution_time=180, 
+            max_execution_time=float(os.getenv('AGENT_MAX_EXECUTION_SECONDS', '30')),
             return_intermediate_steps=True
         )
     
+    def _llm_call_options(self) -> dict:
+        """Per-call timeout: the LLM timeout, cut down to what is left of the request's deadline"""
+        check_deadline("LLM call")
+        return {"timeout": time_left(self.llm_timeout)}
+    
+    async def _ainvoke_llm(self, prompt: str):
+        options = self._llm_call_options()
+        return await asyncio.wait_for(self.llm.ainvoke(prompt, **options), timeout=options["timeout"])
+    
+    def _agent_within_deadline(self):
+        """The ReAct executor with max_execution_time lowered to the remaining budget"""
+        check_deadline("agent")
+        return self.agent.model_copy(update={"max_execution_time": time_left(self.agent.max_execution_time)})
+    
+    async def _arun_agent(self, full_context: str) -> dict:
+        agent = self._agent_within_deadline()
+        return await asyncio.wait_for(agent.ainvoke({"input": full_context}), timeout=time_left())
+    
+    def retrieve_documents(self, query: str, k: int = 3) -> list:
+        """Retrieve knowledge base documents for a query"""
+        if self.knowledge_base:
+            return self.knowledge_base.similarity_search(query, k=k)
+        return []
+    
     def search_knowledge_base(self, query: str, k: int = 3) -> str:
         """Search RAG knowledge base"""
+        knowledge, _ = self._search_with_sources(query, k)
+        return knowledge
+    
+    def _search_with_sources(self, query: str, k: int = 3):
+        """Search RAG knowledge base and return the knowledge text with its sources"""
         if self.vector_store:
             try:
-                docs = self.vector_store.similarity_search(query, k=k)
-                return "\n\n".join([doc.page_content for doc in docs])
+                docs = self.retrieve_documents(query, k=k)
+                knowledge = "\n\n".join([doc.page_content for doc in docs])
+                sources = [doc.metadata.get("source", "Unknown") for doc in docs]
+                return knowledge, sources
             except Exception as e:
                 print(f"Error searching knowledge base: {e}")
-                return "Knowledge base search failed."
-        return "Knowledge base not available."
-    
-    def classify_intent(self, query: str, conversation_history: List[Dict] = None) -> str:
-        """Main intent classification method that uses LLM exclusively"""
-        # Build context from conversation history
-        context_messages = []
-        if conversation_history:
-            # Get last 8 messages for context
-            recent_messages = conversation_history[-8:]
-            for msg in recent_messages:
-                role = "User" if msg["role"] == "user" else "SheGuardia"
-                context_messages.append(f"{role}: {msg['content']}")
-        
-        # Add current query
-        context_messages.append(f"User: {query}")
-        
-        # Create full context
-        full_context = "\n".join(context_messages)
+                return "Knowledge base search failed.", []
+        return "Knowledge base not available.", []
+    
+    def _build_full_context(self, query: str, conversation_history: List[Dict] = None) -> str:
+        """Build the conversation context string from recent history and the current query"""
+        return self.context_builder.build(query, conversation_history)
+    
+    def _get_embedding_model(self):
+        """Return the already loaded knowledge base embedding model, if any"""
+        if self.knowledge_base:
+            return self.knowledge_base.embedding_model
+        return None
+    
+    async def aclassify_intent(self, query: str, conversation_history: List[Dict] = None,
+                               full_context: Optional[str] = None) -> str:
+        """Tiered intent classification: keyword rules, embedding centroids, then the LLM"""
+        if full_context is None:
+            full_context = self._build_full_context(query, conversation_history)
         
+        intent, tier = await self.intent_classifier.aclassify(
+            query,
+            has_history=bool(conversation_history),
+            llm_fallback=lambda: self._aclassify_intent_llm(query, full_context)
+        )
+        if tier != 'llm':
+            print(f"Fast-path classified intent: {intent} ({tier})")
+        return intent
+    
+    def _classification_prompt(self, query: str, full_context: str) -> str:
         # Create prompt for intent classification with detailed examples
-        classification_prompt = f"""
+        return f"""
 You are an intent classifier for the SheGuardia women's safety chatbot.
 Based on the user's message and conversation history, classify the intent into one of these categories:
 
@@ -208,19 +292,23 @@ Analyze the FULL CONVERSATION CONTEXT carefully before deciding. Consider:
 
 Respond with ONLY ONE WORD - the intent category that best matches.
 """
+    
+    def _parse_intent(self, content: str) -> str:
+        intent = content.strip().lower()
         
-        try:
-            response = self.llm.invoke(classification_prompt)
-            intent = response.content.strip().lower()
+        # Validate the intent is one of our categories
+        if intent not in VALID_INTENTS:
+            # Default to safety for unrecognized intents
+            intent = 'safety'
             
-            # Validate the intent is one of our categories
-            valid_intents = ['greeting', 'emergency', 'location', 'safety', 'general']
-            if intent not in valid_intents:
-                # Default to safety for unrecognized intents
-                intent = 'safety'
-                
-            print(f"LLM classified intent: {intent}")
-            return intent
+        print(f"LLM classified intent: {intent}")
+        return intent
+    
+    async def _aclassify_intent_llm(self, query: str, full_context: str) -> str:
+        """Classify intent with the LLM when the local tiers are not confident"""
+        try:
+            response = await self._ainvoke_llm(self._classification_prompt(query, full_context))
+            return self._parse_intent(response.content)
         except Exception as e:
             print(f"Error in LLM intent classification: {e}")
             # If LLM fails, default to safety as the most reasonable fallback
@@ -229,106 +317,286 @@ Respond with ONLY ONE WORD - the intent category that best matches.
     
     def process_query(self, query: str, conversation_history: List[Dict] = None) -> str:
         """Process user query with enhanced capabilities and conversation memory"""
+        return self.process_query_with_intent(query, conversation_history).response
+    
+    def process_query_with_intent(self, query: str, conversation_history: List[Dict] = None) -> QueryResult:
+        """Blocking entry point for scripts; the server awaits aprocess_query_with_intent on its own loop"""
+        return asyncio.run(self.aprocess_query_with_intent(query, conversation_history))
+    
+    async def aprocess_query_with_intent(self, query: str, conversation_history: List[Dict] = None) -> QueryResult:
+        """Run the pipeline once and return the response, intent and sources; cancelling it cancels the LLM and tool calls"""
+        plan = await self._aplan_query(query, conversation_history)
+        return QueryResult(response=await self._agenerate(plan), intent=plan.intent, sources=plan.sources)
+    
+    async def astream_query(self, query: str, conversation_history: List[Dict] = None):
+        """Run the pipeline and yield (event, data) pairs as soon as each part is available"""
+        plan = await self._aplan_query(query, conversation_history)
+        yield "metadata", {"intent": plan.intent, "sources": plan.sources}
         
-        # Build context from conversation history
-        context_messages = []
-        if conversation_history:
-            # Get last 4 messages for context
-            recent_messages = conversation_history[-8:]
-            for msg in recent_messages:
-                role = "User" if msg["role"] == "user" else "SheGuardia"
-                context_messages.append(f"{role}: {msg['content']}")
+        if plan.response is not None:
+            yield "token", {"text": plan.response}
+        elif plan.intent == 'emergency':
+            async for part in self._aemergency_parts(plan):
+                yield "token", {"text": part}
+        else:
+            parts = []
+            try:
+                async for chunk in self.llm.astream(plan.prompt, **self._llm_call_options()):
+                    if chunk.content:
+                        parts.append(chunk.content)
+                        yield "token", {"text": chunk.content}
+                self._remember_response(plan, "".join(parts))
+            except Exception as e:
+                print(f"Error streaming response: {e}")
+                # A partial answer is kept; emergencies always get the static block
+                if not parts or plan.intent == 'emergency':
+                    yield "token", {"text": self._fallback_response(plan, e)}
         
-        # Add current query
-        context_messages.append(f"User: {query}")
+        yield "done", {}
+    
+    async def _aplan_query(self, query: str, conversation_history: List[Dict] = None) -> ResponsePlan:
+        """Classify the query and prepare its answer or the prompt that will produce it"""
+        full_context = self._build_full_context(query, conversation_history)
         
-        # Create full context
-        full_context = "\n".join(context_messages)
+        # Tiered intent classification, run once per query
+        intent = await self.aclassify_intent(query, conversation_history, full_context=full_context)
         
-        # Use LLM-based intent classification
-        intent = self.classify_intent(query, conversation_history)
+        use_cache = self._uses_semantic_cache(intent, query, conversation_history)
+        if use_cache:
+            cached = await asyncio.to_thread(self._cached_plan, intent, query)
+            if cached:
+                return cached
         
         try:
-            if intent == 'greeting':
-                return "Welcome, how can I help you?"
+            plan = await self._aplan_response(intent, query, full_context)
+        except Exception as e:
+            return ResponsePlan(intent, response=self._error_response(intent, e))
+        if use_cache:
+            plan.cache_query = query
+        return plan
+    
+    def _uses_semantic_cache(self, intent: str, query: str, conversation_history: List[Dict] = None) -> bool:
+        """Never for emergencies, and only when the answer cannot depend on earlier turns"""
+        if self.knowledge_base is None or self.knowledge_base.embedding_model is None:
+            return False
+        return self.semantic_cache.applies_to(
+            intent, query, conversation_history,
+            is_greeting=lambda text: self.intent_classifier.classify_by_rules(text) == 'greeting'
+        )
+    
+    def _cached_plan(self, intent: str, query: str) -> Optional[ResponsePlan]:
+        try:
+            cached = self.semantic_cache.lookup(query, intent, generation=self.knowledge_base.generation)
+        except Exception as e:
+            print(f"Error reading semantic cache: {e}")
+            return None
+        if cached is None:
+            return None
+        print(f"Semantic cache hit for {intent} query")
+        response, sources = cached
+        return ResponsePlan(intent, sources=sources, response=response)
+    
+    def _remember_response(self, plan: ResponsePlan, response: str):
+        if not plan.cache_query or not response:
+            return
+        try:
+            self.semantic_cache.store(
+                plan.cache_query, plan.intent, response, plan.sources,
+                generation=self.knowledge_base.generation
+            )
+        except Exception as e:
+            print(f"Error writing semantic cache: {e}")
+    
+    async def _agenerate(self, plan: ResponsePlan) -> str:
+        """Produce the final response text for a plan"""
+        if plan.response is not None:
+            return plan.response
+        if plan.intent == 'emergency':
+            return "".join([part async for part in self._aemergency_parts(plan)])
+        try:
+            response = await self._ainvoke_llm(plan.prompt)
+            self._remember_response(plan, response.content)
+            return response.content
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            return self._fallback_response(plan, e)
+    
+    async def _aemergency_parts(self, plan: ResponsePlan):
+        """Static emergency block first, then nearby services and personalized guidance, each within its budget"""
+        # The LLM starts right away and runs while the static block and tool lookup are delivered;
+        # whatever misses its budget is cancelled instead of left running
+        llm_task = asyncio.create_task(
+            asyncio.wait_for(self._ainvoke_llm(plan.prompt), time_left(self.emergency_llm_budget))
+        )
+        try:
+            yield EMERGENCY_RESPONSE
             
-            elif intent == 'emergency':
-                # Handle emergency situations with personalized response
-                # First, get any location-based information if needed
-                location_info = ""
-                if 'near' in query.lower() or 'location' in query.lower() or 'follow' in query.lower():
-                    try:
-                        agent_response = self.agent.invoke({"input": full_context})
-                        location_info = agent_response['output']
-                    except Exception as e:
-                        print(f"Error getting location info: {e}")
-                        location_info = ""
-                
-                # Create a personalized emergency prompt
-                emergency_prompt = f"""
-{self.custom_prompt_template}
+            if plan.location and self.agent_tools:
+                try:
+                    location_info = await asyncio.wait_for(
+                        self.agent_tools.afind_emergency_services(plan.location), time_left(self.emergency_tool_budget)
+                    )
+                    yield "\n\n" + location_info
+                except Exception as e:
+                    print(f"Error getting location info: {e!r}")
+            
+            try:
+                response = await llm_task
+                yield "\n\n" + response.content
+            except Exception as e:
+                print(f"Emergency guidance skipped: {e!r}")
+        finally:
+            llm_task.cancel()
+    
+    def _fallback_response(self, plan: ResponsePlan, error: Exception) -> str:
+        if plan.fallback is not None:
+            return plan.fallback
+        return self._error_response(plan.intent, error)
+    
+    def _error_response(self, intent: str, error: Exception) -> str:
+        error_msg = f"I apologize, but I encountered an error: {str(error)}. "
+        
+        # Provide emergency numbers as fallback
+        if intent == 'emergency' or intent == 'location':
+            error_msg += "\n\n🚨 **Emergency Numbers:**\n"
+            error_msg += "• Police: 100\n"
+            error_msg += "• Ambulance: 102\n"
+            error_msg += "• Women Helpline: 1091\n"
+            error_msg += "• All Emergency: 112"
+        
+        return error_msg
+    
+    def _uses_knowledge_for_general(self, query: str) -> bool:
+        return any(word in query.lower() for word in ['women', 'safety', 'secure', 'protect'])
+    
+    async def _aplan_response(self, intent: str, query: str, full_context: str) -> ResponsePlan:
+        """Decide how to answer an already classified query"""
+        if intent == 'greeting':
+            return ResponsePlan(intent, response=GREETING_RESPONSE)
+        
+        elif intent == 'emergency':
+            # Deterministic: the location comes from the messages and tools are called directly, no ReAct loop
+            return self._emergency_plan(query, full_context, extract_location_from_context(query, full_context))
+        
+        elif intent == 'location':
+            # Route straight to one tool; the ReAct agent only handles what the router cannot
+            route = self._route_location_query(query, full_context)
+            if route is None:
+                route = self._parse_route(await self._ainvoke_router(query, full_context), query, full_context)
+            if route is None:
+                response = await self._arun_agent(full_context)
+                return ResponsePlan(intent, response=response['output'])
+            tool_name, location = route
+            if not location:
+                return ResponsePlan(intent, response=self._ask_for_location(tool_name))
+            return ResponsePlan(intent, response=await self.agent_tools.arun_for_user(tool_name, location))
+        
+        elif intent == 'safety':
+            # Retrieval is a short CPU-bound embedding pass, keep it off the event loop
+            knowledge, sources = await asyncio.to_thread(self._search_with_sources, query)
+            return self._safety_plan(query, full_context, knowledge, sources)
+        
+        else:
+            knowledge, sources = None, []
+            if self._uses_knowledge_for_general(query):
+                knowledge, sources = await asyncio.to_thread(self._search_with_sources, query)
+            return self._general_plan(intent, query, full_context, knowledge, sources)
+    
+    def _route_location_query(self, query: str, full_context: str):
+        """(tool name, location) from keywords and place-name patterns, or None when the parser is unsure"""
+        tool_name = pick_location_tool(query)
+        location = extract_location_from_context(query, full_context)
+        if tool_name in self.tools_by_name and location:
+            print(f"Routed location query locally: {tool_name}({location})")
+            return tool_name, location
+        return None
+    
+    def _router_prompt(self, query: str, full_context: str) -> str:
+        tool_lines = "\n".join(
+            f"- {name}: {self.tools_by_name[name].description}"
+            for name in TOOL_KEYWORDS if name in self.tools_by_name
+        )
+        return f"""
+You route requests for the SheGuardia women's safety assistant to exactly one tool.
+
+Tools:
+{tool_lines}
 
 Conversation History:
 {full_context}
 
-Context: This is an EMERGENCY situation. The user needs immediate help and personalized guidance.
-Additional location information: {location_info}
-
-Question: {query}
-
-Respond as a caring, supportive friend who understands this is an emergency. 
-Include these critical emergency numbers:
-- Police: 100
-- Ambulance: 102
-- Women Helpline: 1091
-- All Emergency: 112
+Current Query: "{query}"
 
-Provide specific, actionable advice for their exact situation. Be calm, clear, and reassuring.
-Include both immediate safety steps AND emotional support.
+Pick the tool that answers the current query and the place it is about, using the conversation if the query does not name one.
+Respond with ONLY a JSON object like {{"tool": "find_hospitals", "location": "Connaught Place, Delhi"}}.
+Use null for location if no place is known.
 """
-                
-                try:
-                    # Get personalized emergency response
-                    response = self.llm.invoke(emergency_prompt)
-                    return response.content
-                except Exception as e:
-                    print(f"Error getting personalized emergency response: {e}")
-                    # Fallback to standard emergency response
-                    emergency_response = """
-🚨 **EMERGENCY ASSISTANCE**
+    
+    async def _ainvoke_router(self, query: str, full_context: str) -> Optional[str]:
+        """One LLM call that picks the tool and its location argument"""
+        try:
+            response = await self._ainvoke_llm(self._router_prompt(query, full_context))
+            return response.content
+        except Exception as e:
+            print(f"Error routing location query: {e}")
+            return None
+    
+    def _parse_route(self, content: Optional[str], query: str, full_context: str):
+        """Validate the router's JSON; None sends the query to the ReAct fallback"""
+        if not content:
+            return None
+        match = re.search(r"\{.*\}", content, re.DOTALL)
+        try:
+            route = json.loads(match.group(0)) if match else None
+        except ValueError:
+            route = None
+        if not isinstance(route, dict) or route.get("tool") not in TOOL_KEYWORDS or route["tool"] not in self.tools_by_name:
+            print(f"Unusable router output, falling back to the agent: {content!r}")
+            return None
+        
+        location = route.get("location")
+        if not isinstance(location, str) or not location.strip() or location.strip().lower() in ("null", "none", "unknown"):
+            location = extract_location_from_context(query, full_context)
+        print(f"Routed location query with LLM: {route['tool']}({location})")
+        return route["tool"], location.strip() if location else None
+    
+    def _ask_for_location(self, tool_name: str) -> str:
+        places = {
+            'find_hospitals': "hospitals",
+            'find_police_stations': "police stations",
+            'find_emergency_services': "hospitals and police stations",
+            'find_safe_places': "safe places",
+        }.get(tool_name, "places")
+        return (
+            f"I can find the nearest {places} for you 💜 Which area, street or landmark are you near?\n\n"
+            "If you are in danger right now, call 112 (All Emergency) or 1091 (Women Helpline)."
+        )
+    
+    def _emergency_plan(self, query: str, full_context: str, location: Optional[str]) -> ResponsePlan:
+        # The static block already carries the numbers, so the LLM only adds short personalized guidance
+        shown = "The emergency numbers and immediate safety steps have already been shown to the user"
+        if location:
+            shown += f", together with hospitals and police stations near {location}"
+        emergency_prompt = f"""
+{self.custom_prompt_template}
 
-I'm here with you. This sounds serious, and your safety is the priority right now.
+Conversation History:
+{full_context}
 
-**Immediate Actions:**
-1. 📞 **Call Emergency Services:**
-   - Police: 100
-   - Ambulance: 102
-   - Women Helpline: 1091
-   - All Emergency: 112
+Context: This is an EMERGENCY situation. {shown}.
 
-2. 📍 **Share your location** with trusted contacts
-3. 🏃‍♀️ **Move to a safe, public place** if possible
-4. 📱 **Keep your phone charged** and accessible
+Question: {query}
 
-Stay on the line with me. How can I help you right now?
+In at most 3 short sentences, respond as a calm, caring friend: give one or two actions specific to their exact situation and reassure them.
+Do not repeat the emergency numbers.
 """
-                    if location_info:
-                        emergency_response += "\n\n" + location_info
-                    
-                    return emergency_response
-            
-            elif intent == 'location':
-                # Use agent for location-based queries with context
-                response = self.agent.invoke({"input": full_context})
-                return response['output']
-            
-            elif intent == 'safety':
-                # Use RAG for safety knowledge with custom prompt and context
-                knowledge = self.search_knowledge_base(query)
-                
-                if knowledge and knowledge != "Knowledge base not available.":
-                    # Use the custom prompt template with conversation context
-                    formatted_prompt = f"""
+        
+        return ResponsePlan('emergency', prompt=emergency_prompt, fallback=EMERGENCY_RESPONSE, location=location)
+    
+    def _safety_plan(self, query: str, full_context: str, knowledge: str, sources: List[str]) -> ResponsePlan:
+        if knowledge and knowledge != "Knowledge base not available.":
+            # Use the custom prompt template with conversation context
+            formatted_prompt = f"""
 {self.custom_prompt_template}
 
 Conversation History:
@@ -339,24 +607,25 @@ Question: {query}
 
 Provide a clear, informative response in up to 100 words. Be caring and supportive.
 """
-                    
-                    response = self.llm.invoke(formatted_prompt)
-                    return response.content
-                else:
-                    # Fallback response when no context available
-                    return "I don't have specific information about that in my knowledge base. However, I'm here to help with women's safety. Could you ask me something more specific about safety tips, precautions, or emergency situations?"
-            
-            else:
-                # General conversation with context-aware response
-                knowledge = ""
-                if any(word in query.lower() for word in ['women', 'safety', 'secure', 'protect']):
-                    knowledge = self.search_knowledge_base(query)
-                    if not knowledge or knowledge == "Knowledge base not available.":
-                        knowledge = "No specific knowledge available. Provide general support."
-                else:
-                    knowledge = "No specific knowledge available. If off-topic, gently redirect to safety topics while referencing history."
-
-                formatted_prompt = f"""
+            # If the LLM cannot answer within the deadline, the retrieved guidance is still worth sending
+            fallback = (
+                "I'm having trouble putting together a full answer right now 💜 Here's what my safety guides say:\n\n"
+                + knowledge[:800]
+            )
+            return ResponsePlan('safety', sources=sources, prompt=formatted_prompt, fallback=fallback)
+        else:
+            # Fallback response when no context available
+            return ResponsePlan('safety', response="I don't have specific information about that in my knowledge base. However, I'm here to help with women's safety. Could you ask me something more specific about safety tips, precautions, or emergency situations?")
+    
+    def _general_plan(self, intent: str, query: str, full_context: str, knowledge: Optional[str],
+                      sources: List[str]) -> ResponsePlan:
+        # General conversation with context-aware response
+        if knowledge is None:
+            knowledge = "No specific knowledge available. If off-topic, gently redirect to safety topics while referencing history."
+        elif not knowledge or knowledge == "Knowledge base not available.":
+            knowledge = "No specific knowledge available. Provide general support."
+
+        formatted_prompt = f"""
 {self.custom_prompt_template}
 
 Conversation History:
@@ -367,24 +636,7 @@ Question: {query}
 
 Respond as her trusted friend who genuinely cares. Make it engaging and reference history where appropriate.
 """
-                response = self.llm.invoke(formatted_prompt)
-                return response.content
-                
-                # Non-safety related queries
-                return "I am the SheGuardia Women Safety Bot."
-        
-        except Exception as e:
-            error_msg = f"I apologize, but I encountered an error: {str(e)}. "
-            
-            # Provide emergency numbers as fallback
-            if intent == 'emergency' or intent == 'location':
-                error_msg += "\n\n🚨 **Emergency Numbers:**\n"
-                error_msg += "• Police: 100\n"
-                error_msg += "• Ambulance: 102\n"
-                error_msg += "• Women Helpline: 1091\n"
-                error_msg += "• All Emergency: 112"
-            
-            return error_msg
+        return ResponsePlan(intent, sources=sources, prompt=formatted_prompt)
     
     def get_agent_info(self) -> dict:
         """Get information about the agent's capabilities"""
@@ -0,0 +1,133 @@
+import os
+import asyncio
+import time
+import random
+import threading
+import requests
+import httpx
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from deadline import time_left, check_deadline
+
+load_dotenv()
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class PooledHttpClient:
+    """Keep-alive HTTP client with sync and async pools, timeouts and retry-with-backoff bounded by the request deadline"""
+
+    def __init__(self, base_url=None, max_connections=None, timeout=None, max_retries=None, backoff_factor=None):
+        self.base_url = (base_url or os.getenv('GOOGLE_MAPS_BASE_URL', 'https://maps.googleapis.com')).rstrip('/')
+        self.max_connections = max_connections or int(os.getenv('HTTP_MAX_CONNECTIONS_PER_HOST', '20'))
+        self.timeout = timeout or float(os.getenv('HTTP_TIMEOUT_SECONDS', '10'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('HTTP_MAX_RETRIES', '3'))
+        self.backoff_factor = backoff_factor if backoff_factor is not None else float(os.getenv('HTTP_BACKOFF_FACTOR', '0.5'))
+
+        # Sync pool: pool_block makes callers wait for a free connection instead of opening more.
+        # Retries happen in get_json, where they can be cut short by the request deadline.
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.max_connections,
+            pool_block=True,
+            max_retries=0
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._async_client = None
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def _attempt_timeout(self):
+        check_deadline("HTTP request")
+        return time_left(self.timeout)
+
+    def _wait_before_retry(self, delay):
+        """Backoff delay, or None when the deadline leaves no time for another attempt"""
+        remaining = time_left()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+    def get_json(self, path, params=None):
+        """GET a JSON document through the pooled session, retrying 429/5xx and connection errors"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(self.url(path), params=params, timeout=self._attempt_timeout())
+            except (requests.ConnectionError, requests.Timeout):
+                delay = self._wait_before_retry(self._backoff_delay(attempt))
+                if attempt >= self.max_retries or delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._wait_before_retry(self._backoff_delay(attempt, response))
+                if delay is not None:
+                    time.sleep(delay)
+                    continue
+
+            response.raise_for_status()
+            return response.json()
+
+    def _get_async_client(self):
+        """Lazily create the async client on the running event loop"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._async_client
+
+    def _backoff_delay(self, attempt, response=None):
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            return float(response.headers['Retry-After'])
+        # Exponential backoff with jitter so concurrent retries do not align
+        return self.backoff_factor * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    async def aget_json(self, path, params=None):
+        """Async GET of a JSON document, retrying 429/5xx and transport errors with backoff"""
+        client = self._get_async_client()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.get(self.url(path), params=params, timeout=self._attempt_timeout())
+            except httpx.TransportError:
+                delay = self._wait_before_retry(self._backoff_delay(attempt))
+                if attempt >= self.max_retries or delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._wait_before_retry(self._backoff_delay(attempt, response))
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
+
+            response.raise_for_status()
+            return response.json()
+
+    def close(self):
+        self.session.close()
+
+    async def aclose(self):
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+def get_shared_http_client():
+    """Process-wide client so every LocationServices instance reuses the same connections"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = PooledHttpClient()
+        return _shared_client
@@ -0,0 +1,167 @@
+import os
+import re
+import math
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+VALID_INTENTS = ['greeting', 'emergency', 'location', 'safety', 'general']
+
+# Messages made up only of these words are treated as greetings
+GREETING_WORDS = {
+    'hi', 'hii', 'hiii', 'hello', 'helo', 'hey', 'heyy', 'hiya', 'namaste', 'yo',
+    'good', 'morning', 'afternoon', 'evening', 'there', 'sheguardia', 'how', 'are',
+    'you', 'u', 'doing', 'whats', 'up', 'sup', 'dear', 'friend'
+}
+GREETING_OPENERS = {'hi', 'hii', 'hiii', 'hello', 'helo', 'hey', 'heyy', 'hiya', 'namaste', 'yo', 'good', 'how', 'whats', 'sup'}
+
+# Phrases that signal immediate danger in the current message
+EMERGENCY_PATTERNS = [
+    re.compile(pattern) for pattern in [
+        r"\b(someone|somebody|a man|a guy|he|they|some men|a stranger)\b.{0,20}\b(is|are|keeps?)\b.{0,10}\b(following|chasing|stalking|touching|grabbing|attacking|threatening|hitting)\b",
+        r"\bi('?m| am)\b.{0,15}\b(being|getting)\b.{0,5}\b(followed|chased|stalked|attacked|threatened|harassed|assaulted|kidnapped|abused|hit)\b",
+        r"\bi('?m| am)\b.{0,10}\bin danger\b",
+        r"\b(following|chasing|attacking|stalking|threatening) me\b",
+        r"\b(he|someone|somebody) (grabbed|hit|attacked|touched) me\b",
+        r"\b(i need|send) (urgent|immediate) help\b",
+        r"\bhelp me (now|please hurry|he is|someone is)\b",
+        r"\bi('?m| am) (trapped|locked in|being held)\b",
+        r"\b(sos|emergency)[!]+",
+    ]
+]
+
+# Conditional phrasing ahead of an emergency phrase turns it into a safety question ("what if someone is
+# following me"). Only the text before the danger phrase is checked, so "someone is following me,
+# what do I do if he catches up" stays an emergency.
+HYPOTHETICAL_PATTERN = re.compile(
+    r"(^|[.!?]\s+)(how (to|do i|can i|should i)|what to do|tips|advice|ways to)\b|\b(what if|in case|if|suppose|imagine)\b"
+)
+
+# Seed examples used to build one embedding centroid per intent
+INTENT_EXAMPLES = {
+    'greeting': [
+        "hello", "hi there", "good morning", "how are you", "hey, nice to meet you",
+        "hi, who are you?", "good evening SheGuardia",
+    ],
+    'emergency': [
+        "someone is following me", "I'm being threatened", "I'm in danger", "I need urgent help",
+        "a man is touching me on the bus and won't stop", "my ex is outside my door and threatening me",
+        "I think someone is breaking into my house", "the cab driver took a different route and won't stop the car",
+    ],
+    'location': [
+        "where is the nearest hospital", "find police stations near me", "safe places nearby",
+        "hospitals near Connaught Place", "is there a police station close to MG Road",
+        "show me emergency services in Bangalore", "which hotels near the station are open at night",
+    ],
+    'safety': [
+        "how to stay safe at night", "what should I do if I feel uncomfortable", "I need advice",
+        "tips for travelling alone", "how do I deal with harassment at work", "I feel anxious walking home",
+        "what are the women helpline numbers", "how can I protect myself on public transport",
+    ],
+    'general': [
+        "what's the weather", "tell me a joke", "what can you do", "I got a promotion today",
+        "recommend a good book", "what is the capital of France", "I'm bored",
+    ],
+}
+
+
+class IntentClassifier:
+    """Tiered intent classifier: keyword rules, embedding centroids, then the LLM"""
+
+    def __init__(self, embedding_model_provider: Optional[Callable] = None,
+                 embed_query: Optional[Callable[[str], List[float]]] = None):
+        self.embedding_model_provider = embedding_model_provider
+        # Query embeddings go through this when given (e.g. a cached path); the model still builds the centroids
+        self.embed_query = embed_query
+        self.min_similarity = float(os.getenv('INTENT_CENTROID_MIN_SIMILARITY', '0.5'))
+        self.min_margin = float(os.getenv('INTENT_CENTROID_MIN_MARGIN', '0.08'))
+        self.centroids = None
+
+    def classify(self, query: str, has_history: bool = False,
+                 llm_fallback: Optional[Callable[[], str]] = None) -> Tuple[str, str]:
+        """Classify a query and return the intent with the tier that decided it"""
+        intent = self.classify_by_rules(query)
+        if intent:
+            return intent, 'rules'
+
+        intent = self.classify_by_centroids(query, has_history)
+        if intent:
+            return intent, 'centroid'
+
+        if llm_fallback:
+            return llm_fallback(), 'llm'
+        return 'safety', 'default'
+
+    async def aclassify(self, query: str, has_history: bool = False,
+                        llm_fallback: Optional[Callable[[], Awaitable[str]]] = None) -> Tuple[str, str]:
+        """Async version of classify; llm_fallback is a coroutine function"""
+        intent = self.classify_by_rules(query)
+        if intent:
+            return intent, 'rules'
+
+        # The embedding forward pass is CPU work, keep it off the event loop
+        intent = await asyncio.to_thread(self.classify_by_centroids, query, has_history)
+        if intent:
+            return intent, 'centroid'
+
+        if llm_fallback:
+            return await llm_fallback(), 'llm'
+        return 'safety', 'default'
+
+    def classify_by_rules(self, query: str) -> Optional[str]:
+        """Keyword rules for clear greetings and emergencies"""
+        text = query.lower().strip()
+        words = re.findall(r"[a-z]+", text.replace("'", ""))
+
+        if words and len(words) <= 6 and words[0] in GREETING_OPENERS and all(word in GREETING_WORDS for word in words):
+            return 'greeting'
+
+        for pattern in EMERGENCY_PATTERNS:
+            match = pattern.search(text)
+            if match and not HYPOTHETICAL_PATTERN.search(text[:match.start()]):
+                return 'emergency'
+        return None
+
+    def classify_by_centroids(self, query: str, has_history: bool = False) -> Optional[str]:
+        """Nearest-centroid classification over sentence embeddings"""
+        try:
+            embedding_model = self.embedding_model_provider() if self.embedding_model_provider else None
+            if embedding_model is None:
+                return None
+            centroids = self._get_centroids(embedding_model)
+            embed_query = self.embed_query or embedding_model.embed_query
+            vector = _normalize(embed_query(query))
+        except Exception as e:
+            print(f"Error in centroid intent classification: {e}")
+            return None
+
+        scores = sorted(
+            ((_dot(vector, centroid), intent) for intent, centroid in centroids.items()),
+            reverse=True
+        )
+        best_score, best_intent = scores[0]
+        margin = best_score - scores[1][0]
+
+        # Follow-up messages lean on history, so demand a clearer winner
+        required_margin = self.min_margin * 2 if has_history else self.min_margin
+        if best_score >= self.min_similarity and margin >= required_margin:
+            return best_intent
+        return None
+
+    def _get_centroids(self, embedding_model) -> Dict[str, List[float]]:
+        if self.centroids is None:
+            centroids = {}
+            for intent, examples in INTENT_EXAMPLES.items():
+                vectors = [_normalize(v) for v in embedding_model.embed_documents(examples)]
+                mean = [sum(values) / len(vectors) for values in zip(*vectors)]
+                centroids[intent] = _normalize(mean)
+            self.centroids = centroids
+        return self.centroids
+
+
+def _dot(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
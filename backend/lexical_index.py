@@ -0,0 +1,68 @@
+import re
+import math
+import heapq
+from collections import Counter, defaultdict
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Very common words carry no ranking signal and would make every posting list huge
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how', 'i', 'if', 'in', 'is',
+    'it', 'me', 'my', 'of', 'on', 'or', 'should', 'so', 'that', 'the', 'to', 'what', 'when',
+    'where', 'with', 'you', 'your', 'do', 'can'
+}
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+class BM25Index:
+    """In-memory BM25 inverted index over knowledge base chunks"""
+
+    def __init__(self, ids, documents, k1=1.5, b=0.75):
+        self.ids = ids
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)
+        self.doc_lengths = []
+
+        for index, document in enumerate(documents):
+            counts = Counter(tokenize(document.page_content))
+            self.doc_lengths.append(sum(counts.values()))
+            for term, frequency in counts.items():
+                self.postings[term].append((index, frequency))
+
+        self.avg_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 1.0
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, query, k=3):
+        """Top-k (chunk_id, document) pairs by BM25 score; exact terms like helpline numbers match directly"""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for index, frequency in self.postings[term]:
+                length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[index] / self.avg_length)
+                scores[index] += idf * frequency * (self.k1 + 1) / (frequency + length_norm)
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.ids[index], self.documents[index]) for index, _ in top]
+
+    def __len__(self):
+        return len(self.documents)
+
+def reciprocal_rank_fusion(rankings, k=3, rrf_k=60):
+    """Merge ranked (chunk_id, document) lists by summing 1 / (rrf_k + rank)"""
+    scores = defaultdict(float)
+    documents = {}
+    for ranking in rankings:
+        for rank, (chunk_id, document) in enumerate(ranking):
+            scores[chunk_id] += 1.0 / (rrf_k + rank + 1)
+            documents.setdefault(chunk_id, document)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [documents[chunk_id] for chunk_id in best]
@@ -1,148 +1,501 @@
 import os
-import requests
-from dotenv import load_dotenv
+import re
 import math
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from deadline import time_left, submit_with_deadline
+from models import HospitalInfo, HospitalSearchResult, PoliceStationInfo, PoliceStationSearchResult
+from dotenv import load_dotenv
+import numpy as np
+from http_client import get_shared_http_client
+from caching import TTLCache, PersistentTTLCache
+from offline_index import get_shared_offline_index
 
 load_dotenv()
 
+GEOCODING_PATH = "/maps/api/geocode/json"
+PLACES_NEARBY_PATH = "/maps/api/place/nearbysearch/json"
+PLACE_DETAILS_PATH = "/maps/api/place/details/json"
+
+_geocode_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_shared_geocode_cache():
+    """Process-wide geocode cache, SQLite-backed when GEOCODE_CACHE_PATH is set"""
+    global _geocode_cache
+    with _shared_cache_lock:
+        if _geocode_cache is None:
+            max_size = int(os.getenv('GEOCODE_CACHE_SIZE', '2048'))
+            ttl_seconds = float(os.getenv('GEOCODE_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+            db_path = os.getenv('GEOCODE_CACHE_PATH')
+            if db_path:
+                _geocode_cache = PersistentTTLCache(db_path, max_size=max_size, ttl_seconds=ttl_seconds, table="geocode")
+            else:
+                _geocode_cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        return _geocode_cache
+
+_tile_cache = None
+
+def get_shared_tile_cache():
+    """Process-wide cache of Nearby Search results keyed by place type, geohash tile and radius bucket"""
+    global _tile_cache
+    with _shared_cache_lock:
+        if _tile_cache is None:
+            _tile_cache = TTLCache(
+                max_size=int(os.getenv('PLACES_TILE_CACHE_SIZE', '4096')),
+                ttl_seconds=float(os.getenv('PLACES_TILE_CACHE_TTL_SECONDS', str(24 * 3600)))
+            )
+        return _tile_cache
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def geohash_encode(lat, lng, precision=6):
+    """Standard geohash of a coordinate; precision 6 is a tile of roughly 1.2 km x 0.6 km"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bit_count, even = [], 0, 0, True
+    while len(geohash) < precision:
+        value, value_range = (lng, lng_range) if even else (lat, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits = bits << 1
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(geohash)
+
+def geohash_bounds(geohash):
+    """(lat_min, lat_max, lng_min, lng_max) of a geohash tile"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            value_range = lng_range if even else lat_range
+            mid = (value_range[0] + value_range[1]) / 2
+            if (bits >> shift) & 1:
+                value_range[0] = mid
+            else:
+                value_range[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lng_range[0], lng_range[1]
+
+# Requested radii are rounded up to one of these so nearby queries share cache entries
+RADIUS_BUCKETS_M = (1000, 2000, 5000, 10000, 20000, 50000)
+
+def radius_bucket(radius):
+    for bucket in RADIUS_BUCKETS_M:
+        if radius <= bucket:
+            return bucket
+    return RADIUS_BUCKETS_M[-1]
+
+# Largest radius Nearby Search accepts
+MAX_SEARCH_RADIUS_M = 50000
+
+def tile_search_area(geohash, radius):
+    """Centre and radius of one Nearby Search covering radius metres around every point of the tile"""
+    lat_min, lat_max, lng_min, lng_max = geohash_bounds(geohash)
+    center_lat, center_lng = (lat_min + lat_max) / 2, (lng_min + lng_max) / 2
+    # Corners nearer the equator sit slightly farther from the centre
+    corners_km = haversine_km_batch(
+        center_lat, center_lng, [lat_min, lat_min, lat_max, lat_max], [lng_min, lng_max, lng_min, lng_max]
+    )
+    return center_lat, center_lng, min(MAX_SEARCH_RADIUS_M, math.ceil(radius + float(corners_km.max()) * 1000))
+
+LATLNG_PATTERN = re.compile(r"^\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*$")
+
+EARTH_RADIUS_KM = 6371
+
+def haversine_km_batch(lat, lng, lats, lngs):
+    """Great-circle distances in km from one point to arrays of coordinates, in one NumPy pass"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlng = np.radians(np.asarray(lngs, dtype=np.float64)) - np.radians(lng)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def top_k_indices(values, k=None):
+    """Indices of the k smallest values in ascending order; partial selection instead of a full sort"""
+    values = np.asarray(values)
+    if k is None or k >= len(values):
+        return np.argsort(values, kind='stable')
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    candidates = np.argpartition(values, k - 1)[:k]
+    return candidates[np.argsort(values[candidates], kind='stable')]
+
+def rank_places_by_distance(lat, lng, places, k=None, radius_km=None):
+    """Set distance_km from the query point, drop places beyond radius_km and return the nearest k"""
+    if not places:
+        return []
+    distances = haversine_km_batch(
+        lat, lng,
+        [place['location']['lat'] for place in places],
+        [place['location']['lng'] for place in places]
+    )
+    candidates = np.arange(len(places))
+    if radius_km is not None:
+        candidates = candidates[distances <= radius_km]
+    order = candidates[top_k_indices(distances[candidates], k)]
+    return [{**places[i], 'distance_km': round(float(distances[i]), 2)} for i in order]
+
+def normalize_location(location):
+    """Cache key for a location string: case, spacing and edge punctuation do not matter"""
+    return re.sub(r"\s+", " ", str(location).strip().strip(".,;:!?").lower())
+
 class LocationServices:
-    def __init__(self):
+    def __init__(self, http_client=None, geocode_cache=None, tile_cache=None, offline_index=None):
         self.google_api_key = os.getenv('GOOGLE_PLACES_API_KEY') or os.getenv('GOOGLE_MAPS_API_KEY')
         if not self.google_api_key:
             raise ValueError("Google Maps API key not found in environment variables")
-    
-    def get_coordinates(self, location):
-        geocoding_url = "https://maps.googleapis.com/maps/api/geocode/json"
-        params = {
+        # Pooled keep-alive client shared across instances unless one is injected
+        self.http_client = http_client or get_shared_http_client()
+        # Caches define __len__, so an injected empty cache is falsy
+        self.geocode_cache = geocode_cache if geocode_cache is not None else get_shared_geocode_cache()
+        self.tile_cache = tile_cache if tile_cache is not None else get_shared_tile_cache()
+        self.tile_precision = int(os.getenv('PLACES_TILE_PRECISION', '6'))
+        # Local hospitals/police index: 'fallback' when Google fails or is empty, 'primary' to skip Google
+        self.offline_index = offline_index or get_shared_offline_index()
+        self.offline_mode = os.getenv('OFFLINE_INDEX_MODE', 'fallback')
+        # Place-details fan-out: max concurrent lookups and the deadline for the whole batch
+        self.details_concurrency = int(os.getenv('PLACE_DETAILS_CONCURRENCY', '8'))
+        self.details_deadline = float(os.getenv('PLACE_DETAILS_DEADLINE_SECONDS', '4'))
+
+    def _geocode_params(self, location):
+        return {
             'address': location,
             'key': self.google_api_key
         }
-        
+
+    def _parse_coordinates(self, data):
+        if data['status'] == 'OK' and data['results']:
+            location_data = data['results'][0]['geometry']['location']
+            return location_data['lat'], location_data['lng']
+        else:
+            return None, None
+
+    def _cached_coordinates(self, location):
+        # "lat,lng" input needs no geocoding, which keeps the offline index usable without network
+        match = LATLNG_PATTERN.match(str(location))
+        if match:
+            return float(match.group(1)), float(match.group(2))
+        cached = self.geocode_cache.get(normalize_location(location))
+        if cached is not None:
+            return cached[0], cached[1]
+        return None
+
+    def _cache_coordinates(self, location, coordinates):
+        # Failed lookups are not cached so a transient error is retried next time
+        if coordinates[0] is not None:
+            self.geocode_cache.set(normalize_location(location), list(coordinates))
+        return coordinates
+
+    def _offline_coordinates(self, location):
+        """Place names the offline extract knows, for when geocoding is down or finds nothing"""
+        coordinates = self.offline_index.resolve(location) if self.offline_index is not None else None
+        if coordinates is None:
+            return None, None
+        print(f"Resolved {location!r} from the offline index")
+        return coordinates
+
+    def get_coordinates(self, location):
+        cached = self._cached_coordinates(location)
+        if cached:
+            return cached
         try:
-            response = requests.get(geocoding_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data['status'] == 'OK' and data['results']:
-                location_data = data['results'][0]['geometry']['location']
-                return location_data['lat'], location_data['lng']
-            else:
-                return None, None
+            data = self.http_client.get_json(GEOCODING_PATH, params=self._geocode_params(location))
+            coordinates = self._cache_coordinates(location, self._parse_coordinates(data))
         except Exception as e:
             print(f"Error getting coordinates: {e}")
-            return None, None
-    
-    def find_nearby_places(self, location, place_type="hospital", radius=5000):
-        lat, lng = self.get_coordinates(location)
-        if lat is None or lng is None:
-            return []
-        
-        places_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-        params = {
+            coordinates = None, None
+        return coordinates if coordinates[0] is not None else self._offline_coordinates(location)
+
+    async def aget_coordinates(self, location):
+        cached = self._cached_coordinates(location)
+        if cached:
+            return cached
+        try:
+            data = await self.http_client.aget_json(GEOCODING_PATH, params=self._geocode_params(location))
+            coordinates = self._cache_coordinates(location, self._parse_coordinates(data))
+        except Exception as e:
+            print(f"Error getting coordinates: {e}")
+            coordinates = None, None
+        return coordinates if coordinates[0] is not None else self._offline_coordinates(location)
+
+    def _nearby_params(self, lat, lng, place_type, radius):
+        return {
             'location': f"{lat},{lng}",
             'radius': radius,
             'type': place_type,
             'key': self.google_api_key
         }
-        
-        try:
-            response = requests.get(places_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            places = []
-            if data['status'] == 'OK':
-                for place in data['results']:
-                    place_lat = place['geometry']['location']['lat']
-                    place_lng = place['geometry']['location']['lng']
-                    distance = self._calculate_distance(lat, lng, place_lat, place_lng)
-                    
-                    place_info = {
-                        'name': place.get('name', 'Unknown'),
-                        'address': place.get('vicinity', 'Address not available'),
-                        'distance_km': round(distance, 2),
-                        'rating': place.get('rating'),
-                        'place_id': place.get('place_id'),
-                        'location': {
-                            'lat': place_lat,
-                            'lng': place_lng
-                        }
+
+    def _parse_places(self, data):
+        """Places from a Nearby Search response, without distances"""
+        places = []
+        if data['status'] == 'OK':
+            for place in data['results']:
+                place_info = {
+                    'name': place.get('name', 'Unknown'),
+                    'address': place.get('vicinity', 'Address not available'),
+                    'rating': place.get('rating'),
+                    'place_id': place.get('place_id'),
+                    'location': {
+                        'lat': place['geometry']['location']['lat'],
+                        'lng': place['geometry']['location']['lng']
                     }
-                    places.append(place_info)
-                
-                places.sort(key=lambda x: x['distance_km'])
-            
-            return places
-        except Exception as e:
-            print(f"Error finding nearby places: {e}")
+                }
+                places.append(place_info)
+
+        return places
+
+    def _tile_search(self, lat, lng, place_type, radius):
+        """Cache key and Nearby Search params for the point's tile"""
+        # Centred on the tile rather than the first caller, so the entry serves every point in it
+        tile = geohash_encode(lat, lng, self.tile_precision)
+        bucket = radius_bucket(radius)
+        center_lat, center_lng, search_radius = tile_search_area(tile, bucket)
+        return f"{place_type}:{tile}:{bucket}", self._nearby_params(center_lat, center_lng, place_type, search_radius)
+
+    def _offline_places(self, lat, lng, place_type, radius, limit):
+        if self.offline_index is None or not self.offline_index.has_type(place_type):
             return []
-    
-    def _calculate_distance(self, lat1, lon1, lat2, lon2):
-        R = 6371
-        
-        lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
-        lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
-        
-        dlat = lat2_rad - lat1_rad
-        dlon = lon2_rad - lon1_rad
-        
-        a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        distance = R * c
-        return distance
-    
-    def get_place_details(self, place_id):
-        details_url = "https://maps.googleapis.com/maps/api/place/details/json"
-        params = {
+        candidates = self.offline_index.nearest(lat, lng, place_type, n=limit or 20)
+        return rank_places_by_distance(lat, lng, candidates, k=limit, radius_km=radius / 1000)
+
+    def _nearby_search(self, lat, lng, place_type, radius, limit=None):
+        if self.offline_mode == 'primary':
+            offline_places = self._offline_places(lat, lng, place_type, radius, limit)
+            if offline_places:
+                return offline_places
+
+        tile_key, params = self._tile_search(lat, lng, place_type, radius)
+        places = self.tile_cache.get(tile_key)
+        if places is None:
+            try:
+                data = self.http_client.get_json(PLACES_NEARBY_PATH, params=params)
+                places = self._parse_places(data)
+            except Exception as e:
+                print(f"Error finding nearby places: {e}")
+                places = []
+            if places:
+                self.tile_cache.set(tile_key, places)
+
+        if places:
+            return rank_places_by_distance(lat, lng, places, k=limit, radius_km=radius / 1000)
+        return self._offline_places(lat, lng, place_type, radius, limit)
+
+    async def _anearby_search(self, lat, lng, place_type, radius, limit=None):
+        if self.offline_mode == 'primary':
+            offline_places = self._offline_places(lat, lng, place_type, radius, limit)
+            if offline_places:
+                return offline_places
+
+        tile_key, params = self._tile_search(lat, lng, place_type, radius)
+        places = self.tile_cache.get(tile_key)
+        if places is None:
+            try:
+                data = await self.http_client.aget_json(PLACES_NEARBY_PATH, params=params)
+                places = self._parse_places(data)
+            except Exception as e:
+                print(f"Error finding nearby places: {e}")
+                places = []
+            if places:
+                self.tile_cache.set(tile_key, places)
+
+        if places:
+            return rank_places_by_distance(lat, lng, places, k=limit, radius_km=radius / 1000)
+        return self._offline_places(lat, lng, place_type, radius, limit)
+
+    def find_nearby_places(self, location, place_type="hospital", radius=5000, limit=None):
+        """Places of one type sorted by distance; limit keeps only the nearest N"""
+        lat, lng = self.get_coordinates(location)
+        if lat is None or lng is None:
+            return []
+        return self._nearby_search(lat, lng, place_type, radius, limit)
+
+    async def afind_nearby_places(self, location, place_type="hospital", radius=5000, limit=None):
+        lat, lng = await self.aget_coordinates(location)
+        if lat is None or lng is None:
+            return []
+        return await self._anearby_search(lat, lng, place_type, radius, limit)
+
+    def find_nearby_places_multi(self, location, types=("hospital", "police"), radius=5000, limit=None):
+        """Geocode once and run one Nearby Search per type concurrently; results are grouped by type"""
+        types = list(dict.fromkeys(types))
+        lat, lng = self.get_coordinates(location)
+        if lat is None or lng is None or not types:
+            return {place_type: [] for place_type in types}
+
+        with ThreadPoolExecutor(max_workers=len(types)) as executor:
+            futures = [
+                submit_with_deadline(executor, self._nearby_search, lat, lng, place_type, radius, limit)
+                for place_type in types
+            ]
+            return dict(zip(types, [future.result() for future in futures]))
+
+    async def afind_nearby_places_multi(self, location, types=("hospital", "police"), radius=5000, limit=None):
+        """Async version of find_nearby_places_multi"""
+        types = list(dict.fromkeys(types))
+        lat, lng = await self.aget_coordinates(location)
+        if lat is None or lng is None or not types:
+            return {place_type: [] for place_type in types}
+
+        results = await asyncio.gather(
+            *(self._anearby_search(lat, lng, place_type, radius, limit) for place_type in types)
+        )
+        return dict(zip(types, results))
+
+    def _details_params(self, place_id):
+        return {
             'place_id': place_id,
             'fields': 'name,formatted_address,formatted_phone_number,rating,geometry',
             'key': self.google_api_key
         }
-        
+
+    def _parse_details(self, data):
+        if data['status'] == 'OK':
+            return data['result']
+        else:
+            return None
+
+    def get_place_details(self, place_id):
         try:
-            response = requests.get(details_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data['status'] == 'OK':
-                return data['result']
-            else:
-                return None
+            data = self.http_client.get_json(PLACE_DETAILS_PATH, params=self._details_params(place_id))
+            return self._parse_details(data)
         except Exception as e:
             print(f"Error getting place details: {e}")
             return None
-    
-    def find_nearby_hospitals_structured(self, location, radius=5000):
-        hospitals = self.find_nearby_places(location, "hospital", radius)
-       
-        hospitals = hospitals[:20] # hospitals[:8]
-        
+
+    async def aget_place_details(self, place_id):
+        try:
+            data = await self.http_client.aget_json(PLACE_DETAILS_PATH, params=self._details_params(place_id))
+            return self._parse_details(data)
+        except Exception as e:
+            print(f"Error getting place details: {e}")
+            return None
+
+    def _structure_hospital(self, hospital, details, pending=False):
+        hospital_info = {
+            'name': hospital['name'],
+            'address': hospital['address'],
+            'distance_km': hospital['distance_km'],
+            'rating': hospital.get('rating'),
+            'location_coordinates': hospital['location'],
+            'place_id': hospital.get('place_id'),
+            'contact_number': hospital.get('contact_number'),
+            'contact_pending': pending
+        }
+
+        if details:
+            hospital_info['contact_number'] = details.get('formatted_phone_number')
+            if 'formatted_address' in details:
+                hospital_info['address'] = details['formatted_address']
+
+        return HospitalInfo(**hospital_info)
+
+    def _hospital_search_result(self, location, hospitals, details_by_id, radius):
+        """Merge fetched details into the hospitals; ids missing from details_by_id are still pending"""
         structured_hospitals = []
         for hospital in hospitals:
-            hospital_info = {
-                'name': hospital['name'],
-                'address': hospital['address'],
-                'distance_km': hospital['distance_km'],
-                'rating': hospital.get('rating'),
-                'location_coordinates': hospital['location'],
-                'place_id': hospital.get('place_id')
-            }
-            
-            if hospital.get('place_id'):
-                details = self.get_place_details(hospital['place_id'])
-                if details:
-                    hospital_info['contact_number'] = details.get('formatted_phone_number')
-                    if 'formatted_address' in details:
-                        hospital_info['address'] = details['formatted_address']
-            
-            structured_hospitals.append(hospital_info)
-        
-        return {
-            'query_location': location,
-            'hospitals': structured_hospitals,
-            'total_found': len(structured_hospitals),
-            'search_radius_km': radius / 1000
+            place_id = hospital.get('place_id')
+            pending = bool(place_id) and place_id not in details_by_id
+            structured_hospitals.append(self._structure_hospital(hospital, details_by_id.get(place_id), pending))
+
+        return HospitalSearchResult(
+            query_location=location,
+            hospitals=structured_hospitals,
+            total_found=len(structured_hospitals),
+            search_radius_km=radius / 1000
+        )
+
+    def _police_search_result(self, location, stations, radius):
+        police_stations = [
+            PoliceStationInfo(
+                name=station['name'],
+                full_address=station['address'],
+                distance_km=station['distance_km'],
+                contact_number=station.get('contact_number'),
+                rating=station.get('rating'),
+                location_coordinates=station.get('location'),
+                place_id=station.get('place_id')
+            )
+            for station in stations
+        ]
+        return PoliceStationSearchResult(
+            query_location=location,
+            police_stations=police_stations,
+            total_found=len(police_stations),
+            search_radius_km=radius / 1000
+        )
+
+    def fetch_place_details_batch(self, place_ids):
+        """Fetch details concurrently under the configured cap; returns whatever finished before the deadline"""
+        details_by_id = {}
+        if not place_ids:
+            return details_by_id
+
+        executor = ThreadPoolExecutor(max_workers=min(self.details_concurrency, len(place_ids)))
+        futures = {
+            submit_with_deadline(executor, self.get_place_details, place_id): place_id for place_id in place_ids
         }
+        done, not_done = wait(futures, timeout=time_left(self.details_deadline))
+        for future in done:
+            details_by_id[futures[future]] = future.result()
+        if not_done:
+            print(f"Place details deadline hit, {len(not_done)} lookups still pending")
+        # Do not wait for stragglers; they finish (or time out) in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+        return details_by_id
+
+    async def afetch_place_details_batch(self, place_ids):
+        """Async version of fetch_place_details_batch"""
+        details_by_id = {}
+        if not place_ids:
+            return details_by_id
+
+        semaphore = asyncio.Semaphore(self.details_concurrency)
+
+        async def fetch(place_id):
+            async with semaphore:
+                return place_id, await self.aget_place_details(place_id)
+
+        tasks = [asyncio.create_task(fetch(place_id)) for place_id in place_ids]
+        done, not_done = await asyncio.wait(tasks, timeout=time_left(self.details_deadline))
+        for task in done:
+            place_id, details = task.result()
+            details_by_id[place_id] = details
+        if not_done:
+            print(f"Place details deadline hit, {len(not_done)} lookups still pending")
+            for task in not_done:
+                task.cancel()
+        return details_by_id
+
+    def find_nearby_hospitals_structured(self, location, radius=5000):
+        hospitals = self.find_nearby_places(location, "hospital", radius, limit=20)
+
+        place_ids = [hospital['place_id'] for hospital in hospitals if hospital.get('place_id')]
+        details_by_id = self.fetch_place_details_batch(place_ids)
+        return self._hospital_search_result(location, hospitals, details_by_id, radius)
+
+    async def afind_nearby_hospitals_structured(self, location, radius=5000):
+        hospitals = await self.afind_nearby_places(location, "hospital", radius, limit=20)
+
+        place_ids = [hospital['place_id'] for hospital in hospitals if hospital.get('place_id')]
+        details_by_id = await self.afetch_place_details_batch(place_ids)
+        return self._hospital_search_result(location, hospitals, details_by_id, radius)
+
+    def find_nearby_police_structured(self, location, radius=5000):
+        stations = self.find_nearby_places(location, "police", radius)
+        return self._police_search_result(location, stations, radius)
+
+    async def afind_nearby_police_structured(self, location, radius=5000):
+        stations = await self.afind_nearby_places(location, "police", radius)
+        return self._police_search_result(location, stations, radius)
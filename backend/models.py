@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, List, Optional
+import json
 
 class HospitalInfo(BaseModel):
     """Structured hospital information model"""
@@ -10,6 +11,7 @@ class HospitalInfo(BaseModel):
     rating: Optional[float] = Field(default=None, description="Hospital rating out of 5")
     location_coordinates: Optional[dict] = Field(default=None, description="Latitude and longitude coordinates")
     place_id: Optional[str] = Field(default=None, description="Google Places ID for additional details")
+    contact_pending: bool = Field(default=False, description="True when contact details were not fetched before the deadline")
 
 class HospitalSearchResult(BaseModel):
     """Container for hospital search results"""
@@ -18,10 +20,66 @@ class HospitalSearchResult(BaseModel):
     total_found: int = Field(description="Total number of hospitals found")
     search_radius_km: float = Field(description="Search radius used in kilometers")
     
+    # Rendered once per result (LLM text once per limit); the agent, the user and the API all reuse the same strings
+    _markdown: Optional[str] = PrivateAttr(default=None)
+    _llm_text: Dict[int, str] = PrivateAttr(default_factory=dict)
+    _json: Optional[str] = PrivateAttr(default=None)
+    
     class Config:
         json_encoders = {
             float: lambda v: round(v, 2)
         }
+    
+    def to_markdown(self) -> str:
+        """Full answer shown to the user"""
+        if self._markdown is None:
+            if self.total_found == 0:
+                self._markdown = f"I'm having trouble finding hospitals near {self.query_location} right now 💜 Please double-check the location name and try again, or I can help you with emergency numbers: 102 (Ambulance)."
+                return self._markdown
+            
+            lines = [
+                f"🏥 **Hospitals near {self.query_location}:**\n",
+                f"📊 **Found {self.total_found} hospitals within {self.search_radius_km} km**\n",
+            ]
+            for i, hospital in enumerate(self.hospitals, 1):
+                lines.append(f"**{i}. {hospital.name}**")
+                lines.append(f"   📍 **Address:** {hospital.address}")
+                lines.append(f"   📏 **Distance:** {hospital.distance_km} km away")
+                if hospital.contact_number:
+                    lines.append(f"   📞 **Contact:** {hospital.contact_number}")
+                elif hospital.contact_pending:
+                    lines.append("   📞 **Contact:** Contact pending")
+                else:
+                    lines.append("   📞 **Contact:** Not available")
+                if hospital.rating:
+                    lines.append(f"   ⭐ **Rating:** {hospital.rating}/5")
+                if hospital.location_coordinates:
+                    lines.append(f"   🗺️ **Coordinates:** {hospital.location_coordinates['lat']}, {hospital.location_coordinates['lng']}")
+                lines.append("")
+            lines.append("\n🚨 **Emergency Number:** 102 (Ambulance)")
+            lines.append("💡 **Tip:** Call ahead to check availability and services.")
+            self._markdown = "\n".join(lines)
+        return self._markdown
+    
+    def to_llm_text(self, limit: int = 5) -> str:
+        """Compact plain-text summary for agent observations; no formatting or coordinates"""
+        if limit not in self._llm_text:
+            if self.total_found == 0:
+                self._llm_text[limit] = f"No hospitals found near {self.query_location}. Ambulance: 102."
+                return self._llm_text[limit]
+            lines = [f"Hospitals near {self.query_location} ({self.total_found} within {self.search_radius_km} km):"]
+            for hospital in self.hospitals[:limit]:
+                phone = hospital.contact_number or ("pending" if hospital.contact_pending else "n/a")
+                lines.append(f"- {hospital.name}, {hospital.distance_km} km, {hospital.address}, phone {phone}")
+            lines.append("Ambulance: 102")
+            self._llm_text[limit] = "\n".join(lines)
+        return self._llm_text[limit]
+    
+    def to_json(self) -> str:
+        """Indented JSON for API responses"""
+        if self._json is None:
+            self._json = json.dumps(self.model_dump(), indent=2)
+        return self._json
 
 class PoliceStationInfo(BaseModel):
     """Structured police station information model"""
@@ -40,7 +98,56 @@ class PoliceStationSearchResult(BaseModel):
     total_found: int = Field(description="Total number of police stations found")
     search_radius_km: float = Field(description="Search radius used in kilometers")
     
+    _markdown: Optional[str] = PrivateAttr(default=None)
+    _llm_text: Dict[int, str] = PrivateAttr(default_factory=dict)
+    _json: Optional[str] = PrivateAttr(default=None)
+    
     class Config:
         json_encoders = {
             float: lambda v: round(v, 2)
         }
+    
+    def to_markdown(self) -> str:
+        """Full answer shown to the user"""
+        if self._markdown is None:
+            if self.total_found == 0:
+                self._markdown = f"I'm having trouble finding police stations near {self.query_location} right now 💜 Please double-check the location name and try again, or call emergency: 100 (Police)"
+                return self._markdown
+            
+            lines = [f"🚔 **Police Stations near {self.query_location}:**\n"]
+            for i, station in enumerate(self.police_stations, 1):
+                lines.append(f"**{i}. {station.name}**")
+                lines.append(f"   📍 **Address:** {station.full_address}")
+                if station.rating:
+                    lines.append(f"   ⭐ **Rating:** {station.rating}/5")
+                lines.append(f"   📏 **Distance:** {station.distance_km} km")
+                lines.append("")
+            lines.append("\n🚨 **Emergency Number:** 100 (Police)")
+            lines.append("💡 **Tip:** Save these numbers in your phone for quick access.")
+            self._markdown = "\n".join(lines)
+        return self._markdown
+    
+    def to_llm_text(self, limit: int = 5) -> str:
+        """Compact plain-text summary for agent observations"""
+        if limit not in self._llm_text:
+            if self.total_found == 0:
+                self._llm_text[limit] = f"No police stations found near {self.query_location}. Police: 100."
+                return self._llm_text[limit]
+            lines = [f"Police stations near {self.query_location} ({self.total_found} within {self.search_radius_km} km):"]
+            for station in self.police_stations[:limit]:
+                lines.append(f"- {station.name}, {station.distance_km} km, {station.full_address}")
+            lines.append("Police: 100")
+            self._llm_text[limit] = "\n".join(lines)
+        return self._llm_text[limit]
+    
+    def to_json(self) -> str:
+        """Indented JSON for API responses"""
+        if self._json is None:
+            self._json = json.dumps(self.model_dump(), indent=2)
+        return self._json
+
+class QueryResult(BaseModel):
+    """Result of a single agent pipeline run"""
+    response: str = Field(description="Response text for the user")
+    intent: str = Field(description="Intent classified for the query")
+    sources: List[str] = Field(default_factory=list, description="Sources of the retrieved knowledge chunks")
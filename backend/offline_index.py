@@ -0,0 +1,215 @@
+import os
+import re
+import csv
+import json
+import threading
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# OSM amenity tags mapped to the Google place types the rest of the backend uses
+OSM_AMENITY_TYPES = {
+    'hospital': 'hospital',
+    'clinic': 'hospital',
+    'police': 'police',
+}
+
+def _to_unit_vectors(lats, lngs):
+    """Points on the unit sphere; chord length grows monotonically with great-circle distance"""
+    lat_rad = np.radians(lats)
+    lng_rad = np.radians(lngs)
+    return np.column_stack((
+        np.cos(lat_rad) * np.cos(lng_rad),
+        np.cos(lat_rad) * np.sin(lng_rad),
+        np.sin(lat_rad)
+    ))
+
+class EmergencyServicesIndex:
+    """Offline nearest-N index of hospitals and police stations loaded from CSV, GeoJSON or OSM JSON"""
+
+    def __init__(self, places):
+        self.places_by_type = {}
+        for place in places:
+            self.places_by_type.setdefault(place['type'], []).append(place)
+
+        self._coords = {}
+        self._trees = {}
+        for place_type, typed_places in self.places_by_type.items():
+            lats = np.array([place['lat'] for place in typed_places], dtype=np.float64)
+            lngs = np.array([place['lng'] for place in typed_places], dtype=np.float64)
+            vectors = _to_unit_vectors(lats, lngs)
+            self._coords[place_type] = vectors
+            if cKDTree is not None:
+                self._trees[place_type] = cKDTree(vectors)
+
+        self.areas = self._build_gazetteer(places)
+
+        print("Offline emergency index ready: " + ", ".join(
+            f"{len(typed_places)} {place_type}" for place_type, typed_places in self.places_by_type.items()
+        ))
+
+    @staticmethod
+    def _build_gazetteer(places):
+        """Place, suburb and city names mapped to coordinates, for resolving names without geocoding"""
+        areas = {}
+        for field in ('name', 'suburb', 'city'):
+            points = {}
+            for place in places:
+                key = _area_key(place.get(field))
+                if key:
+                    points.setdefault(key, []).append((place['lat'], place['lng']))
+            for key, coordinates in points.items():
+                # A place's own name is most precise, then its suburb, then its city
+                areas.setdefault(key, tuple(float(value) for value in np.mean(coordinates, axis=0)))
+        return areas
+
+    def resolve(self, location):
+        """(lat, lng) for a place, suburb or city named in the extract, or None"""
+        key = _area_key(location)
+        if not key:
+            return None
+        if key in self.areas:
+            return self.areas[key]
+        # "12th Main, Indiranagar, Bangalore": the most specific part the extract knows
+        for part in (_area_key(part) for part in str(location).split(',')):
+            if part in self.areas:
+                return self.areas[part]
+        return None
+
+    @classmethod
+    def load(cls, path):
+        """Load an extract; the format is picked from the file extension and content"""
+        if path.lower().endswith('.csv'):
+            return cls(list(cls._read_csv(path)))
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if 'elements' in data:
+            return cls(list(cls._read_osm(data)))
+        return cls(list(cls._read_geojson(data)))
+
+    @staticmethod
+    def _read_csv(path):
+        """Columns: name, type, lat/latitude, lng/lon/longitude, and optional address, phone, suburb, city"""
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    yield {
+                        'name': row['name'],
+                        'type': row['type'].strip().lower(),
+                        'lat': float(row.get('lat') or row['latitude']),
+                        'lng': float(row.get('lng') or row.get('lon') or row['longitude']),
+                        'address': row.get('address') or 'Address not available',
+                        'phone': row.get('phone') or None,
+                        'suburb': row.get('suburb') or None,
+                        'city': row.get('city') or None,
+                    }
+                except (KeyError, ValueError):
+                    continue
+
+    @staticmethod
+    def _read_geojson(data):
+        for feature in data.get('features', []):
+            geometry = feature.get('geometry') or {}
+            properties = feature.get('properties') or {}
+            if geometry.get('type') != 'Point':
+                continue
+            place_type = properties.get('type') or OSM_AMENITY_TYPES.get(properties.get('amenity'))
+            if not place_type:
+                continue
+            lng, lat = geometry['coordinates'][:2]
+            yield {
+                'name': properties.get('name', 'Unknown'),
+                'type': place_type,
+                'lat': float(lat),
+                'lng': float(lng),
+                'address': properties.get('address') or _osm_address(properties),
+                'phone': properties.get('phone') or properties.get('contact:phone'),
+                'suburb': properties.get('suburb') or properties.get('addr:suburb'),
+                'city': properties.get('city') or properties.get('addr:city'),
+            }
+
+    @staticmethod
+    def _read_osm(data):
+        """Overpass API JSON; ways and relations need 'out center' so they carry a center point"""
+        for element in data['elements']:
+            tags = element.get('tags') or {}
+            place_type = OSM_AMENITY_TYPES.get(tags.get('amenity'))
+            if not place_type:
+                continue
+            point = element if 'lat' in element else element.get('center')
+            if not point:
+                continue
+            yield {
+                'name': tags.get('name', 'Unknown'),
+                'type': place_type,
+                'lat': float(point['lat']),
+                'lng': float(point['lon']),
+                'address': _osm_address(tags),
+                'phone': tags.get('phone') or tags.get('contact:phone'),
+                'suburb': tags.get('addr:suburb'),
+                'city': tags.get('addr:city'),
+            }
+
+    def has_type(self, place_type):
+        return place_type in self.places_by_type
+
+    def nearest(self, lat, lng, place_type="hospital", n=20):
+        """Nearest-N candidate places of a type, without distances; callers rank them"""
+        typed_places = self.places_by_type.get(place_type)
+        if not typed_places:
+            return []
+
+        query = _to_unit_vectors(np.array([lat]), np.array([lng]))[0]
+        n = min(n, len(typed_places))
+        if place_type in self._trees:
+            _, indices = self._trees[place_type].query(query, k=n)
+            indices = np.atleast_1d(indices)
+        else:
+            chord = np.linalg.norm(self._coords[place_type] - query, axis=1)
+            indices = np.argpartition(chord, n - 1)[:n]
+
+        return [
+            {
+                'name': typed_places[int(index)]['name'],
+                'address': typed_places[int(index)]['address'],
+                'rating': None,
+                'place_id': None,
+                'contact_number': typed_places[int(index)]['phone'],
+                'source': 'offline',
+                'location': {
+                    'lat': typed_places[int(index)]['lat'],
+                    'lng': typed_places[int(index)]['lng']
+                }
+            }
+            for index in indices
+        ]
+
+def _area_key(name):
+    return re.sub(r"\s+", " ", str(name).strip().lower()) if name else ""
+
+def _osm_address(tags):
+    if tags.get('addr:full'):
+        return tags['addr:full']
+    parts = [tags.get('addr:housenumber'), tags.get('addr:street'), tags.get('addr:suburb'), tags.get('addr:city')]
+    return ", ".join(part for part in parts if part) or 'Address not available'
+
+_shared_index = None
+_shared_index_loaded = False
+_shared_index_lock = threading.Lock()
+
+def get_shared_offline_index():
+    """Load the index named by OFFLINE_PLACES_PATH once; None when unset or unreadable"""
+    global _shared_index, _shared_index_loaded
+    with _shared_index_lock:
+        if not _shared_index_loaded:
+            _shared_index_loaded = True
+            path = os.getenv('OFFLINE_PLACES_PATH')
+            if path:
+                try:
+                    _shared_index = EmergencyServicesIndex.load(path)
+                except Exception as e:
+                    print(f"Error loading offline emergency index: {e}")
+        return _shared_index
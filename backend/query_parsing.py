@@ -0,0 +1,91 @@
+import re
+from typing import Optional
+
+# "12.9716, 77.5946" anywhere in a message
+INLINE_LATLNG_PATTERN = re.compile(r"(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)")
+
+PREPOSITIONS = r"near|nearby|around|close to|outside|opposite|at|in|from"
+
+# A preposition and the place it may introduce; only the preposition is consumed, so the
+# scan restarts after every preposition even when the words that follow are rejected
+LOCATION_PATTERN = re.compile(rf"\b({PREPOSITIONS})\s+(?:the\s+)?(?=[A-Za-z0-9])", re.IGNORECASE)
+
+PLACE_CHARS_PATTERN = re.compile(r"[A-Za-z0-9 .,'&-]*")
+
+# Where a place name ends: punctuation, the next preposition or a word that starts the next clause
+LOCATION_END_PATTERN = re.compile(
+    rf"\s*(?:[!?;]|\.(?:\s|$)|\b(?:{PREPOSITIONS}|and|but|please|right now|now|help|someone|somebody|he|she|they|"
+    r"who|which|what|where|when|how|is|are|was|were|can|could|should|do|does|i|im|me|asap|urgently|quickly|for|with|to)\b)",
+    re.IGNORECASE
+)
+
+# Places that do not tell us where the user is
+NON_LOCATION_PREFIXES = ('me', 'here', 'my ', 'this ', 'your ', 'our ', 'a ', 'an ', 'home', 'night', 'work')
+
+def extract_location(text: str) -> Optional[str]:
+    """Best-effort place name or "lat,lng" mentioned in a message, or None"""
+    match = INLINE_LATLNG_PATTERN.search(text)
+    if match:
+        return f"{match.group(1)},{match.group(2)}"
+
+    # Place names are told apart from "the bus stop" or "the door" by capitals, which shouting hides
+    if text.isupper():
+        return None
+
+    for match in LOCATION_PATTERN.finditer(text):
+        candidate = PLACE_CHARS_PATTERN.match(text, match.end()).group()
+        end = LOCATION_END_PATTERN.search(candidate)
+        if end:
+            candidate = candidate[:end.start()]
+        candidate = candidate.strip(" .,'&-")
+        if not candidate or not (candidate[0].isupper() or candidate[0].isdigit()):
+            continue
+        if candidate.lower() == 'me' or candidate.lower().startswith(NON_LOCATION_PREFIXES):
+            continue
+        return candidate
+    return None
+
+# How the context builder renders the summary of older user turns
+SUMMARY_PREFIX = "Earlier in this conversation the user said: "
+SUMMARY_SEPARATOR = " | "
+
+def extract_location_from_context(query: str, full_context: str = "") -> Optional[str]:
+    """Location from the current message, else from the most recent user message that names one"""
+    location = extract_location(query)
+    if location:
+        return location
+    for line in reversed(full_context.splitlines()):
+        if line.startswith("User: "):
+            messages = [line[len("User: "):]]
+        elif line.startswith(SUMMARY_PREFIX):
+            # Summarized turns, newest first
+            messages = reversed(line[len(SUMMARY_PREFIX):].split(SUMMARY_SEPARATOR))
+        else:
+            continue
+        for message in messages:
+            location = extract_location(message)
+            if location:
+                return location
+    return None
+
+# Keywords that pick a location tool for the direct router
+TOOL_KEYWORDS = {
+    'find_emergency_services': ('emergency service', 'emergency help', 'all services'),
+    'find_hospitals': ('hospital', 'clinic', 'medical', 'doctor', 'ambulance'),
+    'find_police_stations': ('police', 'thana', 'cop'),
+    'find_safe_places': ('safe place', 'safe spot', 'somewhere safe', 'mall', 'hotel', 'restaurant', 'cafe', 'shelter'),
+}
+
+# Whole words only, plurals allowed: "cop" must not match "copy", nor "mall" "small"
+TOOL_KEYWORD_PATTERNS = {
+    name: re.compile(r"\b(?:" + "|".join(re.escape(keyword) for keyword in keywords) + r")s?\b")
+    for name, keywords in TOOL_KEYWORDS.items()
+}
+
+def pick_location_tool(text: str) -> Optional[str]:
+    """Tool name implied by the keywords in a message, or None when nothing matches"""
+    text = text.lower()
+    matched = [name for name, pattern in TOOL_KEYWORD_PATTERNS.items() if pattern.search(text)]
+    if 'find_hospitals' in matched and 'find_police_stations' in matched:
+        return 'find_emergency_services'
+    return matched[0] if matched else None
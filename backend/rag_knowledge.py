@@ -1,85 +1,411 @@
 import os
-from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
+import re
+import json
+import hashlib
+import time
+import threading
+import multiprocessing
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
 # from langchain_community.vectorstores import Chroma
 from langchain_chroma import Chroma
+from caching import TTLCache
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from vector_index import ChromaRetriever, NumpyVectorIndex
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+class IngestionInProgress(RuntimeError):
+    """Another update_vectorstore call holds the ingest lock"""
+
+def _parse_pdf(path):
+    """Process-pool worker: parse one PDF into page documents"""
+    return PyPDFLoader(path).load()
+
 class WomenSafetyKnowledgeBase:
     def __init__(self, data_path="data/"):
         self.data_path = data_path
         self.chroma_db_path = "./chroma_db"
         self.embedding_model = None
         self.vectorstore = None
+        # Search goes through the retriever: the Chroma collection itself, or a NumPy index exported from it
+        self.retriever = None
+        self.retriever_backend = os.getenv("RETRIEVER_BACKEND", "chroma")
+        self.numpy_index_path = os.getenv("NUMPY_INDEX_PATH", "./vector_index")
+        self.numpy_index_dtype = os.getenv("NUMPY_INDEX_DTYPE", "float16")
+        self.manifest_path = os.path.join(self.chroma_db_path, "ingest_manifest.json")
+        self._ingest_lock = threading.Lock()
+        self.ingest_workers = int(os.getenv("INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.embed_batch_size = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+        
+        # Bumped whenever ingestion changes the store, so cached retrievals from older content are never served
+        self.generation = 0
+        self.query_embedding_cache = TTLCache(
+            max_size=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048")),
+            ttl_seconds=float(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "604800"))
+        )
+        self.retrieval_cache = TTLCache(
+            max_size=int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024")),
+            ttl_seconds=float(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "86400"))
+        )
+        
+        # hybrid fuses BM25 and vector rankings; dense is vector-only
+        self.retrieval_mode = os.getenv("RETRIEVAL_MODE", "hybrid")
+        self.hybrid_candidates = int(os.getenv("HYBRID_CANDIDATES_PER_RESULT", "4"))
+        self.lexical_index = None
+        self._lexical_generation = None
+        self._model_lock = threading.Lock()
+        self._lexical_lock = threading.Lock()
         
     def load_pdf_files(self):
         """Load raw PDF files from data directory"""
-        loader = DirectoryLoader(
-            self.data_path,
-            glob='*.pdf',
-            loader_cls=PyPDFLoader
-        )
-        documents = loader.load()
+        paths = [os.path.join(self.data_path, file_name) for file_name in self._pdf_file_names()]
+        documents = [page for _, pages in self._parse_pdfs(paths) for page in pages or []]
         print(f"Loaded {len(documents)} PDF pages")
         return documents
     
-    def create_chunks(self, extracted_data):
-        """Create text chunks from documents"""
-        text_splitter = RecursiveCharacterTextSplitter(
+    def _parse_pdfs(self, paths):
+        """Parse PDFs in a process pool, yielding (path, pages) as each one finishes; pages is None on failure"""
+        workers = min(self.ingest_workers, len(paths))
+        if workers <= 1:
+            for path in paths:
+                try:
+                    yield path, _parse_pdf(path)
+                except Exception as e:
+                    print(f"Error parsing {path}: {e}")
+                    yield path, None
+            return
+        
+        # Spawned, not forked: the server process already runs torch, httpx and worker threads
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            # Only a couple of files per worker are in flight, so parsed pages never pile up in memory
+            queued = iter(paths)
+            pending = {executor.submit(_parse_pdf, path): path for path in islice(queued, workers * 2)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    next_path = next(queued, None)
+                    if next_path is not None:
+                        pending[executor.submit(_parse_pdf, next_path)] = next_path
+                    try:
+                        yield path, future.result()
+                    except Exception as e:
+                        print(f"Error parsing {path}: {e}")
+                        yield path, None
+    
+    def _get_text_splitter(self):
+        return RecursiveCharacterTextSplitter(
             chunk_size=500,
             chunk_overlap=50
         )
-        text_chunks = text_splitter.split_documents(extracted_data)
+    
+    def create_chunks(self, extracted_data):
+        """Create text chunks from documents"""
+        text_chunks = self._get_text_splitter().split_documents(extracted_data)
         print(f"Created {len(text_chunks)} text chunks")
         return text_chunks
     
+    def _iter_chunks(self, pages):
+        """Chunk page by page so a large handbook is never split all at once"""
+        text_splitter = self._get_text_splitter()
+        for page in pages:
+            yield from text_splitter.split_documents([page])
+    
+    def _write_chunks(self, chunks, file_name, file_hash, metrics):
+        """Embed and store chunks in EMBED_BATCH_SIZE batches; returns the chunk IDs written"""
+        # Name and content together: re-runs are idempotent, and copies of one PDF under two names keep apart
+        id_prefix = hashlib.sha1(f"{file_name}\x00{file_hash}".encode("utf-8")).hexdigest()[:16]
+        chunk_ids = []
+        while True:
+            batch = list(islice(chunks, self.embed_batch_size))
+            if not batch:
+                return chunk_ids
+            batch_ids = [f"{id_prefix}-{len(chunk_ids) + i}" for i in range(len(batch))]
+            started = time.perf_counter()
+            self.vectorstore.add_texts(
+                [chunk.page_content for chunk in batch],
+                metadatas=[chunk.metadata for chunk in batch],
+                ids=batch_ids
+            )
+            metrics["embed_seconds"] += time.perf_counter() - started
+            metrics["chunks"] += len(batch)
+            chunk_ids.extend(batch_ids)
+    
     def get_embedding_model(self):
         """Get HuggingFace embedding model"""
-        if not self.embedding_model:
-            self.embedding_model = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
-            )
+        with self._model_lock:
+            if not self.embedding_model:
+                print("Getting embedding model...")
+                self.embedding_model = HuggingFaceEmbeddings(
+                    model_name="sentence-transformers/all-MiniLM-L6-v2"
+                )
+                # A store opened before the model was loaded needs it for future writes
+                if self.vectorstore is not None:
+                    self.vectorstore._embedding_function = self.embedding_model
         return self.embedding_model
     
     def create_vectorstore(self):
         """Create and save ChromaDB vectorstore"""
-        print("Loading PDF documents...")
-        documents = self.load_pdf_files()
+        print("Creating ChromaDB vectorstore...")
+        self._open_vectorstore()
         
-        if not documents:
+        summary = self.update_vectorstore()
+        if not summary["added"]:
             print("No PDF documents found!")
             return None
         
-        print("Creating text chunks...")
-        text_chunks = self.create_chunks(documents)
-        
-        print("Getting embedding model...")
-        embedding_model = self.get_embedding_model()
-        
-        print("Creating ChromaDB vectorstore...")
-        self.vectorstore = Chroma.from_documents(
-            documents=text_chunks,
-            embedding=embedding_model,
-            persist_directory=self.chroma_db_path
-        )
-        
         print(f"Vectorstore saved to {self.chroma_db_path}")
         print("Knowledge base created successfully!")
         return self.vectorstore
     
+    def _open_vectorstore(self):
+        """Open the store without waiting for the embedding model; searches stay lexical until it loads"""
+        self.vectorstore = Chroma(
+            persist_directory=self.chroma_db_path,
+            embedding_function=self.embedding_model
+        )
+        if self.retriever_backend != "numpy":
+            self.retriever = ChromaRetriever(self.vectorstore)
+        return self.vectorstore
+    
+    def _file_hash(self, path):
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha256.update(block)
+        return sha256.hexdigest()
+    
+    def load_manifest(self):
+        """Ingestion manifest: per-file content hash and the chunk IDs stored for it"""
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    
+    def save_manifest(self, manifest):
+        # Write-then-rename so a crash never leaves a half-written manifest
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def _bootstrap_manifest(self, current_files):
+        """Adopt chunks of a store built before manifests existed, grouped by their source file"""
+        manifest = {"files": {}}
+        existing = self.vectorstore.get(include=["metadatas"])
+        ids_by_file = {}
+        for chunk_id, metadata in zip(existing["ids"], existing["metadatas"]):
+            source = os.path.basename((metadata or {}).get("source", ""))
+            ids_by_file.setdefault(source, []).append(chunk_id)
+        
+        for file_name, chunk_ids in ids_by_file.items():
+            # Files that still exist are assumed unchanged; the rest get purged as deleted
+            manifest["files"][file_name] = {
+                "sha256": current_files.get(file_name, ""),
+                "chunk_ids": chunk_ids
+            }
+        if ids_by_file:
+            print(f"Adopted {sum(len(ids) for ids in ids_by_file.values())} existing chunks into the manifest")
+        return manifest
+    
+    def _pdf_file_names(self):
+        if not os.path.isdir(self.data_path):
+            return []
+        return [file_name for file_name in sorted(os.listdir(self.data_path)) if file_name.lower().endswith(".pdf")]
+    
+    def _current_files(self):
+        return {
+            file_name: self._file_hash(os.path.join(self.data_path, file_name))
+            for file_name in self._pdf_file_names()
+        }
+    
+    def update_vectorstore(self):
+        """Embed only new or changed PDFs and purge deleted ones; safe to run against a live store"""
+        if not self._ingest_lock.acquire(blocking=False):
+            raise IngestionInProgress("Knowledge base ingestion is already running")
+        try:
+            if self.vectorstore is None:
+                self._open_vectorstore()
+            self.get_embedding_model()
+            
+            current_files = self._current_files()
+            manifest = self.load_manifest() or self._bootstrap_manifest(current_files)
+            summary = {"added": [], "updated": [], "removed": [], "unchanged": [], "failed": []}
+            started = time.perf_counter()
+            metrics = {"files": 0, "pages": 0, "chunks": 0, "embed_seconds": 0.0}
+            
+            for file_name in list(manifest["files"]):
+                if file_name not in current_files:
+                    self.vectorstore.delete(ids=manifest["files"][file_name]["chunk_ids"])
+                    del manifest["files"][file_name]
+                    self._invalidate_retrievals()
+                    summary["removed"].append(file_name)
+                    self.save_manifest(manifest)
+            
+            changed = []
+            for file_name, file_hash in current_files.items():
+                if manifest["files"].get(file_name, {}).get("sha256") == file_hash:
+                    summary["unchanged"].append(file_name)
+                else:
+                    changed.append(os.path.join(self.data_path, file_name))
+            
+            for path, pages in self._parse_pdfs(changed):
+                file_name = os.path.basename(path)
+                if pages is None:
+                    # A corrupt PDF keeps its old chunks and is retried on the next update
+                    summary["failed"].append(file_name)
+                    continue
+                
+                file_hash = current_files[file_name]
+                entry = manifest["files"].get(file_name)
+                chunk_ids = self._write_chunks(self._iter_chunks(pages), file_name, file_hash, metrics)
+                metrics["files"] += 1
+                metrics["pages"] += len(pages)
+                
+                # New chunks are live before the old ones are removed, so queries never see a gap
+                if entry:
+                    new_ids = set(chunk_ids)
+                    stale_ids = [chunk_id for chunk_id in entry["chunk_ids"] if chunk_id not in new_ids]
+                    if stale_ids:
+                        self.vectorstore.delete(ids=stale_ids)
+                
+                manifest["files"][file_name] = {"sha256": file_hash, "chunk_ids": chunk_ids}
+                self._invalidate_retrievals()
+                summary["updated" if entry else "added"].append(file_name)
+                self.save_manifest(manifest)
+                
+                elapsed = time.perf_counter() - started
+                print(
+                    f"Embedded {file_name}: {len(chunk_ids)} chunks "
+                    f"({metrics['files']}/{len(changed)} files, {metrics['chunks'] / elapsed:.1f} chunks/s)"
+                )
+            
+            metrics["total_seconds"] = round(time.perf_counter() - started, 3)
+            metrics["embed_seconds"] = round(metrics["embed_seconds"], 3)
+            metrics["chunks_per_second"] = round(metrics["chunks"] / metrics["total_seconds"], 1) if metrics["total_seconds"] else 0.0
+            summary["metrics"] = metrics
+            
+            changed_store = summary["added"] or summary["updated"] or summary["removed"]
+            if self.retriever_backend == "numpy" and (changed_store or self.retriever is None):
+                self.export_numpy_index()
+            print(
+                f"Ingestion done: {len(summary['added'])} added, {len(summary['updated'])} updated, "
+                f"{len(summary['removed'])} removed, {len(summary['unchanged'])} unchanged"
+            )
+            return summary
+        finally:
+            self._ingest_lock.release()
+    
+    def _normalize_query(self, query):
+        """Case, whitespace and trailing punctuation do not change what is retrieved"""
+        return re.sub(r"\s+", " ", query).strip().rstrip("?!.").strip().lower()
+    
+    def embed_query(self, query):
+        """Query embedding, served from an LRU cache so repeated questions skip the model"""
+        key = self._normalize_query(query)
+        embedding = self.query_embedding_cache.get(key)
+        if embedding is None:
+            embedding = self.get_embedding_model().embed_query(key)
+            self.query_embedding_cache.set(key, embedding)
+        return embedding
+    
+    def similarity_search(self, query, k=3):
+        """Search the loaded retriever, reusing cached results for repeated queries"""
+        return self.similarity_search_batch([query], k=k)[0]
+    
+    def similarity_search_batch(self, queries, k=3):
+        """Search many queries at once: one batched embedding pass and one multi-vector index query"""
+        if self.retriever is None:
+            return [[] for _ in queries]
+        
+        # Lexical-only until the embedding model has been loaded
+        mode = "lexical" if self.embedding_model is None else self.retrieval_mode
+        generation = self.generation
+        keys = [self._normalize_query(query) for query in queries]
+        # The normalized query determines the embedding, so it stands in for the vector in the key
+        results = {key: self.retrieval_cache.get((generation, mode, key, k)) for key in dict.fromkeys(keys)}
+        missing = [key for key, docs in results.items() if docs is None]
+        
+        if missing:
+            candidates = k * self.hybrid_candidates if mode == "hybrid" else k
+            rankings = {key: [] for key in missing}
+            if mode != "dense":
+                lexical_index = self._get_lexical_index()
+                for key in missing:
+                    rankings[key].append(lexical_index.search(key, candidates))
+            if mode != "lexical":
+                for key, ranking in zip(missing, self._dense_search(missing, candidates)):
+                    rankings[key].append(ranking)
+            
+            for key in missing:
+                docs = reciprocal_rank_fusion(rankings[key], k=k)
+                self.retrieval_cache.set((generation, mode, key, k), docs)
+                results[key] = docs
+        
+        return [results[key] for key in keys]
+    
+    def _dense_search(self, keys, n):
+        """Ranked (chunk_id, document) lists for normalized queries, embedding uncached ones in one batch"""
+        embeddings = {key: self.query_embedding_cache.get(key) for key in keys}
+        to_embed = [key for key, embedding in embeddings.items() if embedding is None]
+        if to_embed:
+            for key, embedding in zip(to_embed, self.get_embedding_model().embed_documents(to_embed)):
+                self.query_embedding_cache.set(key, embedding)
+                embeddings[key] = embedding
+        
+        return self.retriever.query([embeddings[key] for key in keys], n)
+    
+    def _get_lexical_index(self):
+        """BM25 index over the stored chunks, rebuilt lazily after ingestion changes them"""
+        with self._lexical_lock:
+            if self.lexical_index is None or self._lexical_generation != self.generation:
+                generation = self.generation
+                ids, documents = self.retriever.chunks()
+                self.lexical_index = BM25Index(ids, documents)
+                self._lexical_generation = generation
+                print(f"Built BM25 index over {len(documents)} chunks")
+            return self.lexical_index
+    
+    def _invalidate_retrievals(self):
+        self.generation += 1
+        self.retrieval_cache.clear()
+    
+    def cache_stats(self):
+        return {
+            "generation": self.generation,
+            "retrieval_mode": "lexical" if self.embedding_model is None else self.retrieval_mode,
+            "query_embeddings": self.query_embedding_cache.stats(),
+            "retrievals": self.retrieval_cache.stats()
+        }
+    
+    def export_numpy_index(self):
+        """Snapshot every chunk and embedding from Chroma into the memory-mapped NumPy index"""
+        stored = self.vectorstore.get(include=["embeddings", "documents", "metadatas"])
+        NumpyVectorIndex.build(
+            self.numpy_index_path, stored["ids"], stored["documents"], stored["metadatas"],
+            stored["embeddings"], dtype=self.numpy_index_dtype
+        )
+        self.retriever = NumpyVectorIndex.load(self.numpy_index_path)
+        self._invalidate_retrievals()
+        return self.retriever
+    
     def load_existing_vectorstore(self):
         """Load existing ChromaDB vectorstore"""
+        if self.retriever_backend == "numpy" and os.path.exists(os.path.join(self.numpy_index_path, "vectors.npy")):
+            # One mmap, no Chroma client; ingestion opens Chroma only when it has to write
+            self.retriever = NumpyVectorIndex.load(self.numpy_index_path)
+            return self.retriever
         if os.path.exists(self.chroma_db_path):
             print("Loading existing ChromaDB vectorstore...")
-            embedding_model = self.get_embedding_model()
-            self.vectorstore = Chroma(
-                persist_directory=self.chroma_db_path,
-                embedding_function=embedding_model
-            )
+            self._open_vectorstore()
+            if self.retriever is None:
+                return self.export_numpy_index()
             return self.vectorstore
         return None
 
@@ -90,7 +416,9 @@ def setup_knowledge_base():
     """Setup or load knowledge base"""
     # Try to load existing vectorstore first
     if knowledge_base.load_existing_vectorstore():
-        print("ChromaDB knowledge base loaded successfully!")
+        # Lexical search works as soon as the store is open; the embedding model is warmed separately
+        knowledge_base._get_lexical_index()
+        print(f"Knowledge base loaded successfully ({knowledge_base.retriever_backend} retriever)!")
         return knowledge_base
     else:
         print("Creating new ChromaDB knowledge base...")
@@ -99,6 +427,18 @@ def setup_knowledge_base():
 
 # Test function for database creation
 if __name__ == "__main__":
-    print("Creating ChromaDB Knowledge Base...")
-    kb = setup_knowledge_base()
-    print("Database setup complete!")
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "update":
+        # Incremental sync of data/ into the existing store
+        print("Updating ChromaDB Knowledge Base...")
+        knowledge_base.update_vectorstore()
+        print("Database update complete!")
+    elif len(sys.argv) > 1 and sys.argv[1] == "export-numpy":
+        # Build the NumPy index that RETRIEVER_BACKEND=numpy pods load
+        knowledge_base._open_vectorstore()
+        knowledge_base.export_numpy_index()
+    else:
+        print("Creating ChromaDB Knowledge Base...")
+        kb = setup_knowledge_base()
+        print("Database setup complete!")
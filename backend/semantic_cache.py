@@ -0,0 +1,101 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Only FAQ-style intents are reused; emergencies are always answered fresh
+CACHEABLE_INTENTS = ('safety', 'general')
+
+# Words that point back at earlier turns, making the answer conversation-specific
+CONTEXT_REFERENCE_PATTERN = re.compile(
+    r"\b(he|him|his|she|her|they|them|it|this|that|those|these|above|earlier|again|before|same)\b",
+    re.IGNORECASE
+)
+
+class SemanticResponseCache:
+    """Opt-in cache of generated answers, matched by query-embedding similarity within an intent"""
+
+    def __init__(self, embed_query, enabled=None, threshold=None, max_size=None, ttl_seconds=None):
+        self.embed_query = embed_query
+        self.enabled = enabled if enabled is not None else os.getenv('SEMANTIC_CACHE_ENABLED', 'false').lower() == 'true'
+        self.threshold = threshold or float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92'))
+        self.max_size = max_size or int(os.getenv('SEMANTIC_CACHE_SIZE', '512'))
+        self.ttl_seconds = ttl_seconds or float(os.getenv('SEMANTIC_CACHE_TTL_SECONDS', '3600'))
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def applies_to(self, intent, query, conversation_history=None, is_greeting=None):
+        """Cache only context-free questions: no prior turns beyond greetings and no references to them"""
+        if not self.enabled or intent not in CACHEABLE_INTENTS:
+            return False
+        if CONTEXT_REFERENCE_PATTERN.search(query):
+            return False
+        for msg in conversation_history or []:
+            if msg["role"] == "user" and not (is_greeting and is_greeting(msg["content"])):
+                return False
+        return True
+
+    def _vector(self, query):
+        vector = np.asarray(self.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, query, intent, generation=0):
+        """Return (response, sources) of the most similar fresh entry above the threshold, or None"""
+        vector = self._vector(query)
+        now = time.time()
+        with self._lock:
+            for entry_id in [entry_id for entry_id, entry in self._entries.items() if entry["expires_at"] <= now]:
+                del self._entries[entry_id]
+
+            candidates = [
+                (entry_id, entry) for entry_id, entry in self._entries.items()
+                if entry["intent"] == intent and entry["generation"] == generation
+            ]
+            if candidates:
+                similarities = np.stack([entry["vector"] for _, entry in candidates]) @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    entry_id, entry = candidates[best]
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return entry["response"], entry["sources"]
+            self.misses += 1
+            return None
+
+    def store(self, query, intent, response, sources=None, generation=0):
+        vector = self._vector(query)
+        with self._lock:
+            self._entries[self._next_id] = {
+                "vector": vector,
+                "intent": intent,
+                "generation": generation,
+                "response": response,
+                "sources": list(sources or []),
+                "expires_at": time.time() + self.ttl_seconds
+            }
+            self._next_id += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,130 @@
+import time
+import asyncio
+import threading
+from location_services import LocationServices
+
+# LangChain, Chroma and sentence-transformers are only imported when a service first needs them
+
+def _load_knowledge_base():
+    from rag_knowledge import setup_knowledge_base
+    return setup_knowledge_base()
+
+def _load_agent(knowledge_base, agent_tools):
+    from enhanced_agent import EnhancedSheGuardiaAgent
+    return EnhancedSheGuardiaAgent(knowledge_base=knowledge_base, agent_tools=agent_tools)
+
+class ServiceRegistry:
+    """Builds each heavy service once and hands the same instance to every consumer"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.location_service = None
+        self.knowledge_base = None
+        self.agent_tools = None
+        self.agent = None
+        self.status = {
+            name: {"state": "pending", "load_seconds": None, "error": None}
+            for name in ("location_service", "knowledge_base", "agent", "embedding_model")
+        }
+
+    def _build(self, name, builder):
+        """Run a builder and record its readiness state and load time"""
+        self.status[name].update(state="loading", error=None)
+        started = time.perf_counter()
+        try:
+            service = builder()
+        except Exception as e:
+            self.status[name].update(state="failed", error=str(e), load_seconds=round(time.perf_counter() - started, 3))
+            raise
+        self.status[name].update(state="ready", load_seconds=round(time.perf_counter() - started, 3))
+        return service
+
+    def get_location_service(self):
+        with self._lock:
+            if self.location_service is None:
+                self.location_service = self._build("location_service", LocationServices)
+                print("✅ Location Services initialized")
+            return self.location_service
+
+    def get_knowledge_base(self):
+        with self._lock:
+            if self.knowledge_base is None:
+                self.knowledge_base = self._build("knowledge_base", _load_knowledge_base)
+                print("✅ Knowledge Base initialized")
+            return self.knowledge_base
+
+    def get_agent_tools(self):
+        with self._lock:
+            if self.agent_tools is None:
+                from agent_tools import AgentTools
+                self.agent_tools = AgentTools(location_service=self.get_location_service())
+            return self.agent_tools
+
+    def get_agent(self):
+        with self._lock:
+            if self.agent is None:
+                knowledge_base = self._optional(self.get_knowledge_base, "knowledge base")
+                agent_tools = self._optional(self.get_agent_tools, "agent tools")
+                self.agent = self._build("agent", lambda: _load_agent(knowledge_base, agent_tools))
+                print("✅ Enhanced SheGuardia Agent initialized")
+            return self.agent
+
+    def warm_embedding_model(self):
+        """Load the embedding model last; until then retrieval runs on the BM25 index alone"""
+        knowledge_base = self.get_knowledge_base()
+        with self._lock:
+            if self.status["embedding_model"]["state"] != "ready":
+                self._build("embedding_model", knowledge_base.get_embedding_model)
+                print("✅ Embedding model loaded")
+
+    def _optional(self, builder, name):
+        """A failing dependency degrades the agent instead of preventing it from starting"""
+        try:
+            return builder()
+        except Exception as e:
+            print(f"❌ Error initializing {name}: {e}")
+            return None
+
+    def initialize_fast(self):
+        """Services cheap enough to build before serving traffic"""
+        self._optional(self.get_location_service, "location services")
+        self._optional(self.get_agent_tools, "agent tools")
+
+    def initialize(self):
+        """Build everything; each service is attempted independently"""
+        for builder, name in (
+            (self.get_location_service, "location services"),
+            (self.get_knowledge_base, "knowledge base"),
+            (self.get_agent, "agent"),
+            (self.warm_embedding_model, "embedding model"),
+        ):
+            self._optional(builder, name)
+
+    async def warm_up(self):
+        """Load models and indexes in a worker thread so startup does not wait for them"""
+        started = time.perf_counter()
+        await asyncio.to_thread(self.initialize)
+        print(f"✅ Warm-up finished in {time.perf_counter() - started:.1f}s")
+
+    def readiness(self):
+        return {
+            "ready": all(component["state"] == "ready" for component in self.status.values()),
+            "components": self.status
+        }
+
+registry = ServiceRegistry()
+
+# -------------------------------------------------------------------------
+# FastAPI dependencies: return the shared instance, or None if it is not ready
+# -------------------------------------------------------------------------
+def get_agent():
+    return registry.agent
+
+def get_location_service():
+    return registry.location_service
+
+def get_knowledge_base():
+    return registry.knowledge_base
+
+def get_agent_tools():
+    return registry.agent_tools
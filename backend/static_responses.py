@@ -0,0 +1,24 @@
+# Canned replies that need no model, so they can be served before the agent has loaded
+
+GREETING_RESPONSE = "Welcome, how can I help you?"
+
+NOT_READY_RESPONSE = "Hey lovely 💜, I’m still getting ready to chat. Please try again in a few moments!"
+
+EMERGENCY_RESPONSE = """
+🚨 **EMERGENCY ASSISTANCE**
+
+I'm here with you. This sounds serious, and your safety is the priority right now.
+
+**Immediate Actions:**
+1. 📞 **Call Emergency Services:**
+   - Police: 100
+   - Ambulance: 102
+   - Women Helpline: 1091
+   - All Emergency: 112
+
+2. 📍 **Share your location** with trusted contacts
+3. 🏃‍♀️ **Move to a safe, public place** if possible
+4. 📱 **Keep your phone charged** and accessible
+
+Stay on the line with me. How can I help you right now?
+"""
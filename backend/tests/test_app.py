@@ -0,0 +1,215 @@
+import json
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app, MAX_BATCH_SIZE
+from services import get_agent, get_knowledge_base, get_agent_tools
+from static_responses import NOT_READY_RESPONSE
+
+client = TestClient(app)
+
+class FakeDocument:
+    def __init__(self, text, source):
+        self.page_content = text
+        self.metadata = {"source": source}
+
+class FakeKnowledgeBase:
+    def __init__(self, error=None):
+        self.error = error
+        self.searched_on_loop = []
+        self.batch_calls = []
+
+    def similarity_search(self, query, k=3):
+        try:
+            asyncio.get_running_loop()
+            self.searched_on_loop.append(True)
+        except RuntimeError:
+            self.searched_on_loop.append(False)
+        return [FakeDocument(f"about {query}", "guide.pdf")][:k]
+
+    def similarity_search_batch(self, queries, k=3):
+        self.batch_calls.append(list(queries))
+        return [[FakeDocument(f"about {query}", "guide.pdf")][:k] for query in queries]
+
+    def update_vectorstore(self):
+        if self.error:
+            raise self.error
+        return {"added": ["guide.pdf"]}
+
+@pytest.fixture
+def knowledge_base():
+    fake = FakeKnowledgeBase()
+    app.dependency_overrides[get_knowledge_base] = lambda: fake
+    yield fake
+    app.dependency_overrides.clear()
+
+def test_ingest_is_disabled_without_admin_token(monkeypatch, knowledge_base):
+    monkeypatch.delenv("KNOWLEDGE_ADMIN_TOKEN", raising=False)
+    assert client.post("/knowledge/ingest").status_code == 403
+
+def test_ingest_rejects_wrong_token(monkeypatch, knowledge_base):
+    monkeypatch.setenv("KNOWLEDGE_ADMIN_TOKEN", "secret")
+    assert client.post("/knowledge/ingest").status_code == 401
+    assert client.post("/knowledge/ingest", headers={"X-Admin-Token": "guess"}).status_code == 401
+
+def test_ingest_with_token(monkeypatch, knowledge_base):
+    pytest.importorskip("langchain_chroma")
+    monkeypatch.setenv("KNOWLEDGE_ADMIN_TOKEN", "secret")
+    response = client.post("/knowledge/ingest", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json() == {"added": ["guide.pdf"]}
+
+def test_ingest_reports_lock_conflict_and_failures_apart(monkeypatch, knowledge_base):
+    rag_knowledge = pytest.importorskip("rag_knowledge")
+    monkeypatch.setenv("KNOWLEDGE_ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret"}
+
+    knowledge_base.error = rag_knowledge.IngestionInProgress("Knowledge base ingestion is already running")
+    assert client.post("/knowledge/ingest", headers=headers).status_code == 409
+
+    knowledge_base.error = RuntimeError("chroma is unhappy")
+    assert client.post("/knowledge/ingest", headers=headers).status_code == 500
+
+def test_knowledge_search_runs_off_the_event_loop(knowledge_base):
+    response = client.post("/knowledge/search", json={"query": "night travel", "k": 2})
+    assert response.status_code == 200
+    assert response.json() == {"knowledge": "about night travel", "sources": ["guide.pdf"]}
+    assert knowledge_base.searched_on_loop == [False]
+
+class StreamingAgent:
+    """Replays scripted stream events, optionally failing after them"""
+
+    def __init__(self, events, error=None):
+        self.events = events
+        self.error = error
+        self.calls = []
+
+    async def astream_query(self, message, conversation_history):
+        self.calls.append((message, conversation_history))
+        for event in self.events:
+            yield event
+        if self.error:
+            raise self.error
+
+def use_agent(agent):
+    app.dependency_overrides[get_agent] = lambda: agent
+
+def read_sse(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+@pytest.fixture
+def reset_overrides():
+    yield
+    app.dependency_overrides.clear()
+
+def test_stream_sends_metadata_then_tokens_then_done(reset_overrides):
+    agent = StreamingAgent([
+        ("metadata", {"intent": "safety", "sources": ["guide.pdf"]}),
+        ("token", {"text": "Stay "}),
+        ("token", {"text": "safe."}),
+        ("done", {}),
+    ])
+    use_agent(agent)
+    response = client.post("/chat/stream", json={
+        "message": "tips for night travel",
+        "conversation_history": [{"role": "user", "content": "hi"}],
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert read_sse(response) == agent.events
+    assert agent.calls == [("tips for night travel", [{"role": "user", "content": "hi"}])]
+
+def test_stream_error_ends_with_apology_and_done(reset_overrides):
+    use_agent(StreamingAgent(
+        [("metadata", {"intent": "safety", "sources": []}), ("token", {"text": "Partial"})],
+        error=RuntimeError("LLM connection dropped")
+    ))
+    events = read_sse(client.post("/chat/stream", json={"message": "tips for night travel"}))
+    assert [event for event, _ in events] == ["metadata", "token", "token", "done"]
+    assert "Something went wrong" in events[2][1]["text"]
+
+def test_stream_while_warming_up_serves_static_emergency(reset_overrides):
+    use_agent(None)
+    events = read_sse(client.post("/chat/stream", json={"message": "someone is following me"}))
+    assert [event for event, _ in events] == ["metadata", "token", "done"]
+    assert events[0][1] == {"intent": "emergency", "sources": []}
+
+class LocationTools:
+    """Stands in for AgentTools: records lookups instead of calling the places API"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    async def arun_for_user(self, tool_name, location):
+        self.calls.append((tool_name, location))
+        if self.error:
+            raise self.error
+        return f"{tool_name} near {location}"
+
+def use_agent_tools(agent_tools):
+    app.dependency_overrides[get_agent_tools] = lambda: agent_tools
+
+def test_warming_up_routes_location_queries_to_the_location_service(reset_overrides):
+    use_agent(None)
+    tools = LocationTools()
+    use_agent_tools(tools)
+    response = client.post("/chat", json={"message": "Where is the nearest hospital in Connaught Place?"})
+    assert response.json()["response"] == "find_hospitals near Connaught Place"
+    assert response.json()["intent"] == "location"
+
+    events = read_sse(client.post("/chat/stream", json={
+        "message": "any police station nearby?",
+        "conversation_history": [{"role": "user", "content": "I am staying in Koramangala"}],
+    }))
+    assert events[0][1] == {"intent": "location", "sources": []}
+    assert events[1][1] == {"text": "find_police_stations near Koramangala"}
+    assert tools.calls == [("find_hospitals", "Connaught Place"), ("find_police_stations", "Koramangala")]
+
+def test_warming_up_without_a_place_or_a_working_lookup_is_not_ready(reset_overrides):
+    use_agent(None)
+    use_agent_tools(LocationTools(error=RuntimeError("places API down")))
+    for message in ("Where is the nearest hospital?", "Where is the nearest hospital in Connaught Place?"):
+        response = client.post("/chat", json={"message": message})
+        assert response.json() == {"response": NOT_READY_RESPONSE, "intent": "system", "sources": []}
+
+def test_knowledge_search_batch_embeds_all_queries_in_one_call(knowledge_base):
+    response = client.post("/knowledge/search/batch", json={"queries": ["night travel", "helplines", "cab safety"]})
+    assert [result["knowledge"] for result in response.json()["results"]] == [
+        "about night travel", "about helplines", "about cab safety"
+    ]
+    assert knowledge_base.batch_calls == [["night travel", "helplines", "cab safety"]]
+
+class SlowAgent:
+    """Tracks how many chat pipelines run at once"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def aprocess_query_with_intent(self, message, conversation_history):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return type("Result", (), {"response": f"re: {message}", "intent": "safety", "sources": []})()
+
+def test_chat_batch_caps_concurrent_agent_runs(monkeypatch, reset_overrides):
+    monkeypatch.setattr("app.CHAT_BATCH_CONCURRENCY", 2)
+    agent = SlowAgent()
+    use_agent(agent)
+    messages = [f"question {i}" for i in range(6)]
+    response = client.post("/chat/batch", json={"requests": [{"message": message} for message in messages]})
+    assert [reply["response"] for reply in response.json()["responses"]] == [f"re: {message}" for message in messages]
+    assert agent.peak == 2
+
+def test_oversized_batches_are_rejected(knowledge_base):
+    too_many = MAX_BATCH_SIZE + 1
+    assert client.post("/knowledge/search/batch", json={"queries": ["q"] * too_many}).status_code == 422
+    assert client.post("/chat/batch", json={"requests": [{"message": "q"}] * too_many}).status_code == 422
+    assert knowledge_base.batch_calls == []
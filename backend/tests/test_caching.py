@@ -0,0 +1,35 @@
+import time
+from caching import TTLCache, PersistentTTLCache
+
+def test_get_and_expiry():
+    cache = TTLCache(max_size=4, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=-1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_lru_eviction():
+    cache = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_persistent_cache_survives_restart(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    PersistentTTLCache(db_path, ttl_seconds=60).set("key", {"lat": 1.5})
+    assert PersistentTTLCache(db_path, ttl_seconds=60).get("key") == {"lat": 1.5}
+
+def test_persistent_entry_keeps_its_expiry(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    PersistentTTLCache(db_path, ttl_seconds=60).set("key", "value", ttl_seconds=0.5)
+
+    reloaded = PersistentTTLCache(db_path, ttl_seconds=3600)
+    assert reloaded.get("key") == "value"
+    time.sleep(0.6)
+    assert reloaded.get("key") is None
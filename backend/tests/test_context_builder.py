@@ -0,0 +1,74 @@
+from context_builder import ConversationContextBuilder, count_tokens, truncate_to_tokens
+from query_parsing import SUMMARY_PREFIX, extract_location_from_context
+
+def conversation(turns, reply_length=900):
+    history = []
+    for text in turns:
+        history.append({"role": "user", "content": text})
+        history.append({"role": "assistant", "content": "Here is some advice. " + "x" * reply_length})
+    return history
+
+def test_short_history_is_kept_verbatim():
+    history = conversation(["I feel unsafe at work"], reply_length=10)
+    context = ConversationContextBuilder(token_budget=600).build("what now?", history)
+    assert context.splitlines() == [
+        "User: I feel unsafe at work",
+        "SheGuardia: Here is some advice. xxxxxxxxxx",
+        "User: what now?",
+    ]
+
+def test_assistant_replies_are_trimmed_before_user_turns():
+    history = conversation([f"Message {i} about my commute." for i in range(10)])
+    builder = ConversationContextBuilder(token_budget=200, recent_messages=6)
+    lines = builder.build("what now?", history).splitlines()
+    assert lines[-1] == "User: what now?"
+    assert lines[-2] == "User: Message 9 about my commute."
+    assert not any(line.startswith("SheGuardia:") for line in lines)
+    assert count_tokens("\n".join(lines)) <= 200
+
+def test_trimmed_user_turns_are_folded_into_the_summary():
+    history = conversation([f"Message {i} about my commute." for i in range(10)])
+    builder = ConversationContextBuilder(token_budget=60, recent_messages=6, summary_token_budget=100)
+    lines = builder.build("what now?", history).splitlines()
+    assert lines[0].startswith(SUMMARY_PREFIX)
+    assert "Message 8" in lines[0]
+    assert "User: Message 9 about my commute." in lines
+    assert lines[-1] == "User: what now?"
+
+def test_latest_user_turn_survives_a_zero_budget():
+    history = conversation(["I'm near Forum Mall", "he is still behind me"])
+    builder = ConversationContextBuilder(token_budget=0, recent_messages=6)
+    assert builder.token_budget == 0
+    lines = builder.build("help", history).splitlines()
+    assert lines[-2:] == ["User: he is still behind me", "User: help"]
+
+def test_location_in_a_summarized_turn_reaches_the_router():
+    history = conversation([
+        "I'm scared. I'm waiting at the metro exit in Whitefield.",
+        "he keeps staring",
+        "now he is walking towards me",
+        "what should I do",
+    ])
+    builder = ConversationContextBuilder(token_budget=80, recent_messages=4)
+    context = builder.build("find the nearest police station", history)
+    assert "Whitefield" not in "".join(line for line in context.splitlines() if line.startswith("User:"))
+    assert extract_location_from_context("find the nearest police station", context) == "Whitefield"
+
+def test_summary_extends_from_cached_prefix():
+    builder = ConversationContextBuilder(token_budget=2000, recent_messages=2)
+    history = conversation([f"Turn {i}." for i in range(6)], reply_length=5)
+    builder.build("next", history)
+    hits = builder.summary_cache.stats()["hits"]
+
+    history += conversation(["Turn 6."], reply_length=5)
+    context = builder.build("next", history)
+    assert "Turn 5." in context.splitlines()[0]
+    # Resumed from the summary cached on the previous request; one entry per summarized message
+    assert builder.summary_cache.stats()["hits"] == hits + 1
+    assert len(builder.summary_cache) == len(history) - 2
+
+def test_truncate_to_tokens_marks_the_cut():
+    assert truncate_to_tokens("short", 10) == "short"
+    cut = truncate_to_tokens("word " * 200, 10)
+    assert cut.endswith("…")
+    assert count_tokens(cut) <= 12
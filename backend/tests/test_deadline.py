@@ -0,0 +1,39 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from deadline import (
+    DeadlineExceeded, check_deadline, current_deadline, request_deadline, submit_with_deadline, time_left
+)
+
+def test_time_left_without_deadline_is_the_cap():
+    assert current_deadline() is None
+    assert time_left() is None
+    assert time_left(5) == 5
+
+def test_time_left_is_capped_by_remaining_budget():
+    with request_deadline(0.5) as deadline:
+        assert current_deadline() is deadline
+        assert time_left(10) <= 0.5
+        assert time_left(0.1) == 0.1
+    assert current_deadline() is None
+
+def test_check_deadline_raises_once_expired():
+    with request_deadline(0.05):
+        check_deadline("tool")
+        time.sleep(0.06)
+        with pytest.raises(DeadlineExceeded):
+            check_deadline("tool")
+
+def test_deadline_reaches_pool_threads_and_tasks():
+    with request_deadline(1) as deadline:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert submit_with_deadline(executor, current_deadline).result() is deadline
+            assert executor.submit(current_deadline).result() is None
+
+        async def in_task():
+            return await asyncio.to_thread(current_deadline)
+
+        assert asyncio.run(in_task()) is deadline
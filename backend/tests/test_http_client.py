@@ -0,0 +1,137 @@
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+import requests
+
+from deadline import request_deadline
+from http_client import PooledHttpClient
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Replays the server's scripted responses in order, repeating the last one"""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            status, headers, delay = server.script[min(len(server.requests), len(server.script)) - 1]
+        if delay:
+            time.sleep(delay)
+        body = json.dumps({"status": "OK", "path": self.path}).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.script = [(200, {}, 0)]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_client(server, **kwargs):
+    options = {"timeout": 5, "max_retries": 3, "backoff_factor": 0.01}
+    options.update(kwargs)
+    return PooledHttpClient(base_url=f"http://127.0.0.1:{server.server_port}", **options)
+
+def test_get_json_returns_body(stub_server):
+    client = make_client(stub_server)
+    assert client.get_json("/maps/api/place", params={"q": "x"})["status"] == "OK"
+    assert stub_server.requests == ["/maps/api/place?q=x"]
+
+def test_retries_5xx_then_succeeds(stub_server):
+    stub_server.script = [(503, {}, 0), (502, {}, 0), (200, {}, 0)]
+    client = make_client(stub_server)
+    assert client.get_json("/retry")["status"] == "OK"
+    assert len(stub_server.requests) == 3
+
+def test_gives_up_after_max_retries(stub_server):
+    stub_server.script = [(500, {}, 0)]
+    client = make_client(stub_server, max_retries=2)
+    with pytest.raises(requests.HTTPError):
+        client.get_json("/broken")
+    assert len(stub_server.requests) == 3
+
+def test_client_errors_are_not_retried(stub_server):
+    stub_server.script = [(404, {}, 0)]
+    client = make_client(stub_server)
+    with pytest.raises(requests.HTTPError):
+        client.get_json("/missing")
+    assert len(stub_server.requests) == 1
+
+def test_honours_retry_after(stub_server):
+    stub_server.script = [(429, {"Retry-After": "1"}, 0), (200, {}, 0)]
+    client = make_client(stub_server)
+    started = time.monotonic()
+    assert client.get_json("/limited")["status"] == "OK"
+    assert time.monotonic() - started >= 1
+
+def test_deadline_skips_retry_that_cannot_fit(stub_server):
+    stub_server.script = [(429, {"Retry-After": "5"}, 0)]
+    client = make_client(stub_server)
+    started = time.monotonic()
+    with request_deadline(1):
+        with pytest.raises(requests.HTTPError):
+            client.get_json("/limited")
+    assert time.monotonic() - started < 1
+    assert len(stub_server.requests) == 1
+
+def test_deadline_bounds_slow_response(stub_server):
+    stub_server.script = [(200, {}, 3)]
+    client = make_client(stub_server, max_retries=0)
+    started = time.monotonic()
+    with request_deadline(0.5):
+        with pytest.raises(requests.Timeout):
+            client.get_json("/slow")
+    assert time.monotonic() - started < 2
+
+def test_connection_errors_are_retried():
+    client = PooledHttpClient(base_url="http://127.0.0.1:9", timeout=1, max_retries=2, backoff_factor=0.01)
+    with pytest.raises(requests.ConnectionError):
+        client.get_json("/refused")
+
+def test_async_retries_then_succeeds(stub_server):
+    stub_server.script = [(503, {}, 0), (200, {}, 0)]
+    client = make_client(stub_server)
+
+    async def fetch():
+        try:
+            return await client.aget_json("/async")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(fetch())["status"] == "OK"
+    assert len(stub_server.requests) == 2
+
+def test_async_deadline_bounds_slow_response(stub_server):
+    stub_server.script = [(200, {}, 3)]
+    client = make_client(stub_server, max_retries=0)
+
+    async def fetch():
+        try:
+            with request_deadline(0.5):
+                return await client.aget_json("/slow")
+        finally:
+            await client.aclose()
+
+    started = time.monotonic()
+    with pytest.raises(httpx.TimeoutException):
+        asyncio.run(fetch())
+    assert time.monotonic() - started < 2
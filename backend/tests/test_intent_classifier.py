@@ -0,0 +1,101 @@
+import pytest
+from intent_classifier import INTENT_EXAMPLES, IntentClassifier
+
+classifier = IntentClassifier()
+
+@pytest.mark.parametrize("message", [
+    "Someone is following me, what should I do?",
+    "He is following me, what can I do",
+    "Can you help? a guy is following me",
+    "Someone is following me, what do I do if he catches up",
+    "I am being followed, not sure if he saw me",
+    "help me now he is outside, if you can call someone",
+    "I'm being followed",
+    "help me now he is outside",
+    "SOS!!",
+])
+def test_emergencies_are_caught_by_rules(message):
+    assert classifier.classify_by_rules(message) == 'emergency'
+
+@pytest.mark.parametrize("message", [
+    "What if someone is following me?",
+    "What should I do if someone is following me",
+    "How to handle someone following me",
+    "In case a stranger is following me, who do I call",
+    "tips for when someone keeps following me",
+])
+def test_hypotheticals_are_left_to_later_tiers(message):
+    assert classifier.classify_by_rules(message) is None
+
+@pytest.mark.parametrize("message", ["hi", "Good morning SheGuardia", "hey how are you"])
+def test_greetings(message):
+    assert classifier.classify_by_rules(message) == 'greeting'
+
+def test_safety_questions_are_not_greetings():
+    assert classifier.classify_by_rules("how do I stay safe on the metro") is None
+
+class FakeEmbeddings:
+    """One axis per intent: seed examples sit on their intent's axis, queries are scripted"""
+
+    def __init__(self, query_vectors):
+        self.axes = {intent: index for index, intent in enumerate(INTENT_EXAMPLES)}
+        self.query_vectors = query_vectors
+        self.document_calls = 0
+
+    def embed_documents(self, texts):
+        self.document_calls += 1
+        intent = next(intent for intent, examples in INTENT_EXAMPLES.items() if examples == texts)
+        return [self.vector({intent: 1.0}) for _ in texts]
+
+    def embed_query(self, text):
+        return self.vector(self.query_vectors[text])
+
+    def vector(self, weights):
+        vector = [0.0] * len(self.axes)
+        for intent, weight in weights.items():
+            vector[self.axes[intent]] = weight
+        return vector
+
+def centroid_classifier(query_vectors, embed_query=None):
+    embeddings = FakeEmbeddings(query_vectors)
+    classifier = IntentClassifier(embedding_model_provider=lambda: embeddings, embed_query=embed_query)
+    classifier.min_similarity = 0.5
+    classifier.min_margin = 0.08
+    return classifier, embeddings
+
+def test_centroid_tier_picks_a_clear_winner():
+    classifier, embeddings = centroid_classifier({
+        "where can I get a doctor": {'location': 0.9, 'safety': 0.3},
+        "is my route safe": {'safety': 0.8, 'general': 0.2},
+    })
+    assert classifier.classify("where can I get a doctor") == ('location', 'centroid')
+    assert classifier.classify_by_centroids("is my route safe") == 'safety'
+    # Centroids are built once and reused
+    assert embeddings.document_calls == len(INTENT_EXAMPLES)
+
+def test_centroid_tier_requires_similarity_threshold():
+    # Normalized, this scores about 0.45 for every one of the five intents
+    classifier, _ = centroid_classifier({"hmm": {intent: 1.0 for intent in INTENT_EXAMPLES}})
+    assert classifier.classify_by_centroids("hmm") is None
+    assert classifier.classify("hmm", llm_fallback=lambda: 'general') == ('general', 'llm')
+
+def test_centroid_tier_requires_margin_wider_with_history():
+    # Similarities of about 0.74 and 0.67: a 0.07 margin
+    classifier, _ = centroid_classifier({"unsure": {'safety': 1.0, 'general': 0.9}})
+    assert classifier.classify_by_centroids("unsure") is None
+    # About 0.78 vs 0.62: a 0.156 margin clears 0.08, but follow-ups need twice that
+    classifier, _ = centroid_classifier({"leaning": {'safety': 1.0, 'general': 0.8}})
+    assert classifier.classify_by_centroids("leaning") == 'safety'
+    assert classifier.classify_by_centroids("leaning", has_history=True) is None
+
+def test_centroid_tier_embeds_queries_through_the_given_function():
+    embedded = []
+
+    def cached_embed_query(text):
+        embedded.append(text)
+        return embeddings.vector({'location': 1.0})
+
+    classifier, embeddings = centroid_classifier({}, embed_query=cached_embed_query)
+    # FakeEmbeddings has no vector scripted for this query, so the model's own embed_query would fail
+    assert classifier.classify_by_centroids("hospital near me") == 'location'
+    assert embedded == ["hospital near me"]
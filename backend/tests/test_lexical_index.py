@@ -0,0 +1,32 @@
+from lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+class Doc:
+    def __init__(self, text):
+        self.page_content = text
+
+DOCS = [
+    Doc("Call the women helpline 1091 for immediate assistance."),
+    Doc("Share your live location with a friend when travelling at night."),
+    Doc("Night buses and well lit stops are safer when travelling late."),
+]
+IDS = ["a", "b", "c"]
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("What is the Helpline number?") == ["helpline", "number"]
+
+def test_bm25_matches_exact_terms():
+    index = BM25Index(IDS, DOCS)
+    assert [chunk_id for chunk_id, _ in index.search("helpline 1091", k=3)] == ["a"]
+    assert {chunk_id for chunk_id, _ in index.search("travelling at night", k=2)} == {"b", "c"}
+    assert index.search("unknown words", k=3) == []
+
+def test_bm25_prefers_rarer_terms():
+    index = BM25Index(IDS, DOCS)
+    assert index.search("live night", k=1)[0][0] == "b"
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    dense = [("b", DOCS[1]), ("c", DOCS[2]), ("a", DOCS[0])]
+    lexical = [("c", DOCS[2]), ("a", DOCS[0])]
+    # c and a appear in both lists and outrank b, the dense-only top hit
+    assert reciprocal_rank_fusion([dense, lexical], k=3) == [DOCS[2], DOCS[0], DOCS[1]]
+    assert reciprocal_rank_fusion([[], []], k=3) == []
@@ -0,0 +1,204 @@
+import time
+import asyncio
+import threading
+
+import numpy as np
+
+from caching import TTLCache
+from offline_index import EmergencyServicesIndex
+from location_services import (
+    LocationServices, geohash_bounds, geohash_encode, haversine_km_batch,
+    radius_bucket, rank_places_by_distance, tile_search_area, top_k_indices
+)
+
+def test_geohash_encode_known_value():
+    assert geohash_encode(42.6, -5.6, precision=5) == "ezs42"
+
+def test_geohash_bounds_contain_the_point():
+    lat_min, lat_max, lng_min, lng_max = geohash_bounds(geohash_encode(12.9716, 77.5946))
+    assert lat_min <= 12.9716 <= lat_max
+    assert lng_min <= 77.5946 <= lng_max
+
+def test_radius_bucket_rounds_up():
+    assert radius_bucket(800) == 1000
+    assert radius_bucket(5000) == 5000
+    assert radius_bucket(7000) == 10000
+    assert radius_bucket(10 ** 6) == 50000
+
+def test_tile_search_area_covers_every_point_of_the_tile():
+    tile = geohash_encode(12.9716, 77.5946)
+    center_lat, center_lng, search_radius = tile_search_area(tile, 2000)
+    lat_min, lat_max, lng_min, lng_max = geohash_bounds(tile)
+    corners_km = haversine_km_batch(center_lat, center_lng, [lat_min, lat_min, lat_max, lat_max], [lng_min, lng_max, lng_min, lng_max])
+    assert search_radius >= 2000 + corners_km.max() * 1000
+
+def test_top_k_indices_matches_full_sort():
+    values = np.random.default_rng(0).random(100)
+    assert list(top_k_indices(values, 5)) == list(np.argsort(values)[:5])
+    assert list(top_k_indices(values)) == list(np.argsort(values, kind='stable'))
+    assert len(top_k_indices(values, 0)) == 0
+
+def test_rank_places_by_distance_filters_radius():
+    places = [
+        {'name': 'far', 'location': {'lat': 13.1, 'lng': 77.6}},
+        {'name': 'near', 'location': {'lat': 12.972, 'lng': 77.595}},
+    ]
+    ranked = rank_places_by_distance(12.9716, 77.5946, places, radius_km=5)
+    assert [place['name'] for place in ranked] == ['near']
+    assert ranked[0]['distance_km'] < 0.1
+
+class RecordingHttpClient:
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def get_json(self, path, params=None):
+        self.calls.append(params)
+        return {'status': 'OK', 'results': self.results}
+
+def place(name, lat, lng):
+    return {'name': name, 'vicinity': name, 'place_id': name, 'geometry': {'location': {'lat': lat, 'lng': lng}}}
+
+def test_tile_entry_serves_other_points_in_the_tile(monkeypatch):
+    monkeypatch.setenv('GOOGLE_PLACES_API_KEY', 'test-key')
+    tile = geohash_encode(12.9716, 77.5946)
+    lat_min, lat_max, lng_min, lng_max = geohash_bounds(tile)
+    first = (lat_min + 0.0005, lng_min + 0.0005)
+    second = (lat_max - 0.0005, lng_max - 0.0005)
+    # Within 1 km of the second point but more than 1 km from the first
+    beside_second = place('beside second', lat_max - 0.0005, lng_max + 0.004)
+
+    http_client = RecordingHttpClient([beside_second])
+    services = LocationServices(http_client=http_client, tile_cache=TTLCache(), offline_index=EmergencyServicesIndex([]))
+    services.offline_mode = 'off'
+
+    assert services._nearby_search(*first, 'hospital', 1000) == []
+    names = [result['name'] for result in services._nearby_search(*second, 'hospital', 1000)]
+    assert names == ['beside second']
+    assert len(http_client.calls) == 1
+
+    center_lat, center_lng, search_radius = tile_search_area(tile, 1000)
+    assert http_client.calls[0]['location'] == f"{center_lat},{center_lng}"
+    assert http_client.calls[0]['radius'] == search_radius
+
+class DetailsHttpClient:
+    """Nearby Search returns fixed hospitals; details for ids in slow_ids take slow_seconds"""
+
+    def __init__(self, places, slow_ids=(), slow_seconds=2.0, delay=0.05):
+        self.places = places
+        self.slow_ids = set(slow_ids)
+        self.slow_seconds = slow_seconds
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def _response(self, path, params):
+        if 'place_id' not in params:
+            return {'status': 'OK', 'results': self.places}
+        return {'status': 'OK', 'result': {'formatted_phone_number': f"phone-{params['place_id']}"}}
+
+    def _delay(self, params):
+        return self.slow_seconds if params.get('place_id') in self.slow_ids else self.delay
+
+    def _enter(self):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def _exit(self):
+        with self.lock:
+            self.active -= 1
+
+    def get_json(self, path, params=None):
+        if 'place_id' in params:
+            self._enter()
+            try:
+                time.sleep(self._delay(params))
+            finally:
+                self._exit()
+        return self._response(path, params)
+
+    async def aget_json(self, path, params=None):
+        if 'place_id' in params:
+            self._enter()
+            try:
+                await asyncio.sleep(self._delay(params))
+            finally:
+                self._exit()
+        return self._response(path, params)
+
+def details_services(monkeypatch, http_client, concurrency=3, deadline=0.5):
+    monkeypatch.setenv('GOOGLE_PLACES_API_KEY', 'test-key')
+    monkeypatch.setenv('PLACE_DETAILS_CONCURRENCY', str(concurrency))
+    monkeypatch.setenv('PLACE_DETAILS_DEADLINE_SECONDS', str(deadline))
+    services = LocationServices(http_client=http_client, tile_cache=TTLCache(), offline_index=EmergencyServicesIndex([]))
+    services.offline_mode = 'off'
+    return services
+
+HOSPITALS = [place(f"h{i}", 12.9716 + i * 0.001, 77.5946) for i in range(8)]
+
+def check_pending(result, slow_ids):
+    assert result.total_found == len(HOSPITALS)
+    for hospital in result.hospitals:
+        if hospital.place_id in slow_ids:
+            assert hospital.contact_pending and hospital.contact_number is None
+        else:
+            assert not hospital.contact_pending and hospital.contact_number == f"phone-{hospital.place_id}"
+
+def test_details_fan_out_is_capped(monkeypatch):
+    http_client = DetailsHttpClient(HOSPITALS)
+    services = details_services(monkeypatch, http_client, concurrency=3, deadline=5)
+    details = services.fetch_place_details_batch([f"h{i}" for i in range(8)])
+    assert len(details) == 8
+    assert http_client.max_active == 3
+
+def test_details_deadline_returns_finished_and_marks_rest_pending(monkeypatch):
+    slow_ids = {"h1", "h5"}
+    http_client = DetailsHttpClient(HOSPITALS, slow_ids=slow_ids)
+    services = details_services(monkeypatch, http_client, concurrency=8, deadline=0.5)
+    started = time.monotonic()
+    result = services.find_nearby_hospitals_structured("12.9716,77.5946")
+    assert time.monotonic() - started < 1.5
+    check_pending(result, slow_ids)
+
+def test_async_details_fan_out_is_capped(monkeypatch):
+    http_client = DetailsHttpClient(HOSPITALS)
+    services = details_services(monkeypatch, http_client, concurrency=3, deadline=5)
+    details = asyncio.run(services.afetch_place_details_batch([f"h{i}" for i in range(8)]))
+    assert len(details) == 8
+    assert http_client.max_active == 3
+
+def test_async_details_deadline_cancels_stragglers(monkeypatch):
+    slow_ids = {"h0", "h7"}
+    http_client = DetailsHttpClient(HOSPITALS, slow_ids=slow_ids)
+    services = details_services(monkeypatch, http_client, concurrency=8, deadline=0.5)
+    started = time.monotonic()
+    result = asyncio.run(services.afind_nearby_hospitals_structured("12.9716,77.5946"))
+    assert time.monotonic() - started < 1.5
+    check_pending(result, slow_ids)
+    assert http_client.active == 0
+
+class UnreachableHttpClient:
+    def get_json(self, path, params=None):
+        raise ConnectionError("maps.googleapis.com unreachable")
+
+    async def aget_json(self, path, params=None):
+        raise ConnectionError("maps.googleapis.com unreachable")
+
+def test_place_names_resolve_offline_when_geocoding_fails(monkeypatch):
+    monkeypatch.setenv('GOOGLE_PLACES_API_KEY', 'test-key')
+    index = EmergencyServicesIndex([
+        {'name': 'Indiranagar Hospital', 'type': 'hospital', 'lat': 12.97, 'lng': 77.64,
+         'address': '100 Feet Road', 'phone': None, 'suburb': 'Indiranagar', 'city': 'Bengaluru'},
+        {'name': 'Hebbal Police Station', 'type': 'police', 'lat': 13.04, 'lng': 77.59,
+         'address': 'Bellary Road', 'phone': '100', 'suburb': 'Hebbal', 'city': 'Bengaluru'},
+    ])
+    services = LocationServices(http_client=UnreachableHttpClient(), tile_cache=TTLCache(), offline_index=index)
+
+    assert services.get_coordinates("Indiranagar") == (12.97, 77.64)
+    assert asyncio.run(services.aget_coordinates("12th Main, Hebbal")) == (13.04, 77.59)
+    assert services.get_coordinates("Atlantis") == (None, None)
+
+    hospitals = services.find_nearby_places("indiranagar, Bengaluru", "hospital")
+    assert [hospital['name'] for hospital in hospitals] == ['Indiranagar Hospital']
@@ -0,0 +1,33 @@
+from models import HospitalInfo, HospitalSearchResult, PoliceStationInfo, PoliceStationSearchResult
+
+def hospital_result(count=3):
+    hospitals = [
+        HospitalInfo(name=f"Hospital {i}", address=f"Road {i}", distance_km=i + 0.5, contact_number="080" if i == 1 else None)
+        for i in range(1, count + 1)
+    ]
+    return HospitalSearchResult(query_location="Indiranagar", hospitals=hospitals, total_found=count, search_radius_km=5)
+
+def test_llm_text_respects_each_limit():
+    result = hospital_result()
+    assert result.to_llm_text(limit=1).count("\n- ") == 1
+    assert result.to_llm_text(limit=3).count("\n- ") == 3
+    assert result.to_llm_text(limit=1).count("\n- ") == 1
+    assert result.to_llm_text(limit=1) is result.to_llm_text(limit=1)
+
+def test_renderers_are_memoized():
+    result = hospital_result()
+    assert result.to_markdown() is result.to_markdown()
+    assert result.to_json() is result.to_json()
+    assert "📞 **Contact:** 080" in result.to_markdown()
+
+def test_empty_results_render_fallback_numbers():
+    assert "102" in hospital_result(count=0).to_llm_text()
+    police = PoliceStationSearchResult(query_location="Hebbal", police_stations=[], total_found=0, search_radius_km=5)
+    assert "100" in police.to_markdown()
+    assert "100" in police.to_llm_text(limit=2)
+
+def test_police_llm_text_respects_limit():
+    stations = [PoliceStationInfo(name=f"Station {i}", full_address=f"Road {i}", distance_km=i) for i in range(4)]
+    police = PoliceStationSearchResult(query_location="Hebbal", police_stations=stations, total_found=4, search_radius_km=5)
+    assert police.to_llm_text(limit=2).count("\n- ") == 2
+    assert police.to_llm_text().count("\n- ") == 4
@@ -0,0 +1,49 @@
+import json
+import offline_index
+from offline_index import EmergencyServicesIndex
+
+PLACES = [
+    {'name': 'Near Hospital', 'type': 'hospital', 'lat': 12.972, 'lng': 77.595, 'address': 'A', 'phone': None},
+    {'name': 'Far Hospital', 'type': 'hospital', 'lat': 13.10, 'lng': 77.70, 'address': 'B', 'phone': None},
+    {'name': 'Station', 'type': 'police', 'lat': 12.98, 'lng': 77.60, 'address': 'C', 'phone': '100'},
+]
+
+def test_nearest_orders_by_distance():
+    index = EmergencyServicesIndex(PLACES)
+    assert [place['name'] for place in index.nearest(12.9716, 77.5946, 'hospital', n=2)] == ['Near Hospital', 'Far Hospital']
+    assert index.nearest(12.9716, 77.5946, 'police', n=5)[0]['contact_number'] == '100'
+    assert index.nearest(12.9716, 77.5946, 'fire_station') == []
+
+def test_nearest_without_scipy(monkeypatch):
+    monkeypatch.setattr(offline_index, 'cKDTree', None)
+    index = EmergencyServicesIndex(PLACES)
+    assert index.nearest(13.09, 77.69, 'hospital', n=1)[0]['name'] == 'Far Hospital'
+
+def test_load_csv_and_osm(tmp_path):
+    csv_path = tmp_path / "places.csv"
+    csv_path.write_text("name,type,lat,lng\nCity Hospital,Hospital,12.97,77.59\nBroken,hospital,x,77\n", encoding="utf-8")
+    assert [place['name'] for place in EmergencyServicesIndex.load(str(csv_path)).nearest(12.97, 77.59)] == ['City Hospital']
+
+    osm_path = tmp_path / "places.json"
+    osm_path.write_text(json.dumps({"elements": [
+        {"lat": 12.97, "lon": 77.59, "tags": {"amenity": "police", "name": "Thana", "addr:street": "MG Road"}},
+        {"center": {"lat": 12.98, "lon": 77.60}, "tags": {"amenity": "clinic", "name": "Clinic"}},
+        {"lat": 12.99, "lon": 77.61, "tags": {"amenity": "cafe"}},
+    ]}), encoding="utf-8")
+    index = EmergencyServicesIndex.load(str(osm_path))
+    assert index.nearest(12.97, 77.59, 'police')[0]['address'] == 'MG Road'
+    assert index.nearest(12.97, 77.59, 'hospital')[0]['name'] == 'Clinic'
+
+def test_resolve_prefers_place_then_suburb_then_city():
+    index = EmergencyServicesIndex([
+        {'name': 'A', 'type': 'hospital', 'lat': 12.0, 'lng': 77.0, 'address': '', 'phone': None, 'suburb': 'Koramangala', 'city': 'Bengaluru'},
+        {'name': 'B', 'type': 'police', 'lat': 12.2, 'lng': 77.2, 'address': '', 'phone': None, 'suburb': 'Koramangala', 'city': 'Bengaluru'},
+        {'name': 'Bengaluru', 'type': 'police', 'lat': 13.0, 'lng': 78.0, 'address': '', 'phone': None, 'suburb': None, 'city': 'Bengaluru'},
+    ])
+    assert index.resolve("Koramangala") == (12.1, 77.1)
+    assert index.resolve("  koramangala ") == (12.1, 77.1)
+    assert index.resolve("5th Block, Koramangala, Bengaluru") == (12.1, 77.1)
+    # A place literally named after the city wins over the city's centroid
+    assert index.resolve("Bengaluru") == (13.0, 78.0)
+    assert index.resolve("Atlantis") is None
+    assert index.resolve("") is None
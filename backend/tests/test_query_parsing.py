@@ -0,0 +1,62 @@
+import pytest
+from query_parsing import extract_location, extract_location_from_context, pick_location_tool
+
+@pytest.mark.parametrize("message, location", [
+    ("I'm in danger in Indiranagar", "Indiranagar"),
+    ("being followed at night in Whitefield", "Whitefield"),
+    ("threatening me at work near Sector 5", "Sector 5"),
+    ("in a cab with a creepy driver near Hebbal flyover", "Hebbal flyover"),
+    ("In Mumbai what hospital is best", "Mumbai"),
+    ("hospitals near Connaught Place, please", "Connaught Place"),
+    ("someone is following me near MG Road and I'm scared", "MG Road"),
+    ("police stations close to the Forum Mall", "Forum Mall"),
+    ("I am at 12th Main Indiranagar", "12th Main Indiranagar"),
+    ("my location is 12.9716, 77.5946 help", "12.9716,77.5946"),
+])
+def test_place_names_are_found(message, location):
+    assert extract_location(message) == location
+
+@pytest.mark.parametrize("message", [
+    "someone is following me near the bus stop",
+    "he is waiting around the corner",
+    "he is outside the door",
+    "I'm close to the park",
+    "I'm in danger",
+    "find hospitals near me",
+    "I'm at home and scared",
+    "HELP I AM IN DANGER",
+])
+def test_generic_places_are_not_locations(message):
+    assert extract_location(message) is None
+
+def test_context_falls_back_to_latest_user_line():
+    context = "\n".join([
+        "User: I'm staying in Koramangala",
+        "SheGuardia: Stay safe in Delhi",
+        "User: I moved to a hotel in Whitefield",
+        "User: is there a hospital nearby?",
+    ])
+    assert extract_location_from_context("is there a hospital nearby?", context) == "Whitefield"
+    assert extract_location_from_context("any police near Hebbal?", context) == "Hebbal"
+    assert extract_location_from_context("is there a hospital nearby?", "") is None
+
+@pytest.mark.parametrize("message, tool", [
+    ("nearest hospitals to Indiranagar", "find_hospitals"),
+    ("any cops near MG Road", "find_police_stations"),
+    ("police station near Hebbal", "find_police_stations"),
+    ("hospital and police near Whitefield", "find_emergency_services"),
+    ("is there a cafe open near Forum Mall", "find_safe_places"),
+    ("malls near Koramangala", "find_safe_places"),
+])
+def test_pick_location_tool(message, tool):
+    assert pick_location_tool(message) == tool
+
+@pytest.mark.parametrize("message", [
+    "can I get a copy of my complaint",
+    "what is the scope of the women's commission",
+    "a small shop near Indiranagar",
+    "the hotelier kept calling me",
+    "a cafeteria in my office",
+])
+def test_keywords_inside_other_words_do_not_route(message):
+    assert pick_location_tool(message) is None
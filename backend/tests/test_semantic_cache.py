@@ -0,0 +1,42 @@
+from semantic_cache import SemanticResponseCache
+
+VECTORS = {
+    "how to stay safe at night": [1.0, 0.0, 0.0],
+    "how do i stay safe at night": [0.99, 0.1, 0.0],
+    "what are helpline numbers": [0.0, 1.0, 0.0],
+}
+
+def make_cache(**kwargs):
+    options = {"enabled": True, "threshold": 0.9, "max_size": 2, "ttl_seconds": 60}
+    options.update(kwargs)
+    return SemanticResponseCache(lambda query: VECTORS[query], **options)
+
+def test_similar_query_hits_within_intent_and_generation():
+    cache = make_cache()
+    cache.store("how to stay safe at night", "safety", "Stay in lit areas.", ["guide.pdf"])
+    assert cache.lookup("how do i stay safe at night", "safety") == ("Stay in lit areas.", ["guide.pdf"])
+    assert cache.lookup("how do i stay safe at night", "general") is None
+    assert cache.lookup("how do i stay safe at night", "safety", generation=1) is None
+    assert cache.lookup("what are helpline numbers", "safety") is None
+
+def test_expired_and_evicted_entries_are_dropped():
+    cache = make_cache(ttl_seconds=-1)
+    cache.store("how to stay safe at night", "safety", "old")
+    assert cache.lookup("how to stay safe at night", "safety") is None
+
+    cache = make_cache(max_size=1)
+    cache.store("how to stay safe at night", "safety", "first")
+    cache.store("what are helpline numbers", "safety", "second")
+    assert cache.lookup("how to stay safe at night", "safety") is None
+    assert cache.stats()["size"] == 1
+
+def test_applies_only_to_context_free_faq_questions():
+    cache = make_cache()
+    assert cache.applies_to("safety", "how to stay safe at night")
+    assert not cache.applies_to("emergency", "how to stay safe at night")
+    assert not cache.applies_to("safety", "what should I do about him")
+    history = [{"role": "user", "content": "my boss keeps messaging me"}]
+    assert not cache.applies_to("safety", "how to stay safe at night", history)
+    greeting = [{"role": "user", "content": "hi"}]
+    assert cache.applies_to("safety", "how to stay safe at night", greeting, is_greeting=lambda text: text == "hi")
+    assert not make_cache(enabled=False).applies_to("safety", "how to stay safe at night")
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("langchain_core")
+from vector_index import NumpyVectorIndex
+
+def build_and_load(tmp_path, dtype, count=50, dim=16):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(count, dim)).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(count)]
+    texts = [f"text {i}" for i in range(count)]
+    metadatas = [{"source": f"doc{i % 3}.pdf"} for i in range(count)]
+    NumpyVectorIndex.build(str(tmp_path), ids, texts, metadatas, embeddings, dtype=dtype)
+    return NumpyVectorIndex.load(str(tmp_path)), embeddings
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_query_finds_each_vector_first(tmp_path, dtype):
+    index, embeddings = build_and_load(tmp_path, dtype)
+    results = index.query(embeddings[:5] * 3, n=3)
+    assert [matches[0][0] for matches in results] == [f"chunk-{i}" for i in range(5)]
+    assert all(len(matches) == 3 for matches in results)
+    assert results[0][0][1].metadata == {"source": "doc0.pdf"}
+
+def test_int8_index_drops_stale_scales_when_rebuilt_as_float16(tmp_path):
+    build_and_load(tmp_path, "int8")
+    index, _ = build_and_load(tmp_path, "float16")
+    assert index.scales is None
+
+def test_matches_exact_float32_ranking(tmp_path):
+    index, embeddings = build_and_load(tmp_path, "float16", count=200)
+    query = np.random.default_rng(1).normal(size=(1, embeddings.shape[1])).astype(np.float32)
+    normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ query[0]))[:5]
+    assert [chunk_id for chunk_id, _ in index.query(query, n=5)[0]] == [f"chunk-{i}" for i in expected]
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_empty_store_builds_an_empty_index(tmp_path, dtype):
+    NumpyVectorIndex.build(str(tmp_path), [], [], [], None, dtype=dtype)
+    index = NumpyVectorIndex.load(str(tmp_path))
+    assert len(index) == 0
+    assert index.query([[0.1, 0.2]], n=3) == [[]]
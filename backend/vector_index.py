@@ -0,0 +1,128 @@
+import os
+import json
+import numpy as np
+from langchain_core.documents import Document
+
+# Rows converted to float32 per matmul block; bounds the temporary copy for float16/int8 matrices
+SEARCH_BLOCK_ROWS = 16384
+
+class ChromaRetriever:
+    """Retriever backend over the Chroma collection the ingestion pipeline writes to"""
+
+    def __init__(self, vectorstore):
+        self.vectorstore = vectorstore
+
+    def chunks(self):
+        """All stored chunks as (ids, documents)"""
+        stored = self.vectorstore.get(include=["documents", "metadatas"])
+        documents = [
+            Document(page_content=text, metadata=metadata or {})
+            for text, metadata in zip(stored["documents"], stored["metadatas"])
+        ]
+        return stored["ids"], documents
+
+    def query(self, embeddings, n):
+        """Ranked (chunk_id, document) lists, one per query embedding, in a single collection query"""
+        matches = self.vectorstore._collection.query(
+            query_embeddings=embeddings,
+            n_results=n,
+            include=["documents", "metadatas"]
+        )
+        return [
+            [
+                (chunk_id, Document(page_content=text, metadata=metadata or {}))
+                for chunk_id, text, metadata in zip(ids, texts, metadatas)
+            ]
+            for ids, texts, metadatas in zip(matches["ids"], matches["documents"], matches["metadatas"])
+        ]
+
+class NumpyVectorIndex:
+    """Exact top-k over one memory-mapped embedding matrix stored as float16 or per-row scaled int8"""
+
+    def __init__(self, ids, documents, matrix, scales=None):
+        self.ids = ids
+        self.documents = documents
+        self.matrix = matrix
+        self.scales = scales
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map the matrix; only the chunk texts are read into memory"""
+        with open(os.path.join(path, "chunks.json"), encoding="utf-8") as f:
+            chunks = json.load(f)
+        matrix = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        scales_path = os.path.join(path, "scales.npy")
+        scales = np.load(scales_path) if os.path.exists(scales_path) else None
+        documents = [Document(page_content=chunk["text"], metadata=chunk["metadata"] or {}) for chunk in chunks]
+        print(f"Loaded NumPy vector index: {matrix.shape[0]} chunks, {matrix.dtype}")
+        return cls([chunk["id"] for chunk in chunks], documents, matrix, scales)
+
+    @staticmethod
+    def build(path, ids, texts, metadatas, embeddings, dtype="float16"):
+        """Write L2-normalized embeddings, quantized to dtype, alongside the chunk texts"""
+        os.makedirs(path, exist_ok=True)
+        if len(ids) == 0:
+            # An empty store still gets an index, so numpy pods load it instead of failing
+            vectors = np.zeros((0, 0), dtype=np.float32)
+        else:
+            vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        scales = None
+        if dtype == "int8":
+            # max() has no identity for an empty matrix, so an empty store gets empty scales
+            scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.ones(0, dtype=np.float32)
+            scales[scales == 0] = 1.0
+            vectors = np.round(vectors / scales[:, None]).astype(np.int8)
+        else:
+            vectors = vectors.astype(np.float16)
+
+        # Write-then-rename so pods never map a half-written file
+        for name, array in (("vectors.npy", vectors), ("scales.npy", scales)):
+            target = os.path.join(path, name)
+            if array is None:
+                if os.path.exists(target):
+                    os.remove(target)
+                continue
+            with open(target + ".tmp", "wb") as f:
+                np.save(f, array)
+            os.replace(target + ".tmp", target)
+
+        chunks = [
+            {"id": chunk_id, "text": text, "metadata": metadata}
+            for chunk_id, text, metadata in zip(ids, texts, metadatas)
+        ]
+        with open(os.path.join(path, "chunks.json.tmp"), "w", encoding="utf-8") as f:
+            json.dump(chunks, f)
+        os.replace(os.path.join(path, "chunks.json.tmp"), os.path.join(path, "chunks.json"))
+        print(f"Wrote NumPy vector index: {len(ids)} chunks, {vectors.dtype}")
+
+    def chunks(self):
+        return self.ids, self.documents
+
+    def query(self, embeddings, n):
+        """Cosine scores by matrix product against all queries at once, then partial top-n per query"""
+        if not self.ids:
+            return [[] for _ in embeddings]
+        queries = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+
+        scores = np.empty((self.matrix.shape[0], len(queries)), dtype=np.float32)
+        for start in range(0, self.matrix.shape[0], SEARCH_BLOCK_ROWS):
+            block = np.asarray(self.matrix[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ queries.T
+        if self.scales is not None:
+            scores *= self.scales[:, None]
+
+        n = min(n, len(self.ids))
+        results = []
+        for column in scores.T:
+            top = np.argpartition(-column, n - 1)[:n]
+            top = top[np.argsort(-column[top], kind="stable")]
+            results.append([(self.ids[index], self.documents[index]) for index in top])
+        return results
+
+    def __len__(self):
+        return len(self.ids)